@@ -1,66 +1,49 @@
 import streamlit as st
 import plotly.graph_objects as go, plotly.express as px
 import pandas as pd
-    
 
-ruta = 'https://github.com/juliandariogiraldoocampo/analisis_taltech/raw/refs/heads/main/explorador/Estado_de_la_prestaci%C3%B3n_del_servicio_de_energ%C3%ADa_en_Zonas_No_Interconectadas_20251021.csv'
-df = pd.read_csv(ruta)
+from src.cache_figuras import CacheFiguras
+from src.zni import TTL_CACHE, PipelineZNI
 
-df['ENERGÍA REACTIVA'] = df['ENERGÍA REACTIVA'].str.replace(',', '').astype(float).astype(int)
-df['ENERGÍA ACTIVA'] = df['ENERGÍA ACTIVA'].str.replace(',', '').astype(float).astype(int)
-df['POTENCIA MÁXIMA'] = df['POTENCIA MÁXIMA'].str.replace(',', '').astype(float)
 
-lst_cambio = [['Á','A'],['É','E'], ['Í','I'], ['Ó','O'], ['Ú','U']]
+@st.cache_resource
+def pipeline_vigente():
+    # Un solo pipeline por proceso, compartido por todas las sesiones;
+    # las tablas se calculan al pedirlas
+    return {'pipeline': PipelineZNI()}
 
-# Realizar los reemplazos en las columnas 'DEPARTAMENTO' y 'MUNICIPIO'
-for i in range(5):
-    df['DEPARTAMENTO'] = df['DEPARTAMENTO'].str.replace(lst_cambio[i][0],lst_cambio[i][1])
-    df['MUNICIPIO'] = df['MUNICIPIO'].str.replace(lst_cambio[i][0],lst_cambio[i][1])
 
-# Crear una condición negativa para filtrar los departamentos no deseados
-condicion_filtro = ~df['DEPARTAMENTO'].isin([
-'ARCHIPIELAGO DE SAN ANDRES',
-'ARCHIPIELAGO DE SAN ANDRES y PROVIDENCIA',
-'ARCHIPIELAGO DE SAN ANDRES, PROVIDENCIA Y SANTA CATALINA'
-])
-df_colombia_continental = df[condicion_filtro]
+@st.cache_resource(ttl=TTL_CACHE)
+def obtener_pipeline():
+    # Cada TTL_CACHE segundos se revisa la copia local de los datos. Si hay una
+    # nueva, el pipeline nuevo conserva los indicadores y solo suma las filas nuevas
+    vigente = pipeline_vigente()
+    vigente['pipeline'] = vigente['pipeline'].renovar()
+    return vigente['pipeline']
 
-df_agrupado = df_colombia_continental.groupby(['DEPARTAMENTO', 'MUNICIPIO'])[['ENERGÍA ACTIVA', 'ENERGÍA REACTIVA']].sum().reset_index()
 
-df_pivote = df_colombia_continental.pivot_table(
-    index = 'DEPARTAMENTO',
-    columns = 'AÑO SERVICIO',
-    values = ['ENERGÍA ACTIVA'],
-    aggfunc = 'sum'
-)
+@st.cache_resource
+def obtener_cache_figuras():
+    # Un solo caché por proceso, compartido por todas las sesiones
+    return CacheFiguras(max_bytes=64 * 1024 * 1024)
 
-# Cálculo de Total por Año de Energía Activa
-df_activa = df_colombia_continental.pivot_table(
-    columns = 'AÑO SERVICIO',
-    values = ['ENERGÍA ACTIVA'],
-    aggfunc = 'sum'
-).reset_index(drop=True)
 
-filas = df.shape[0]
-variables = df.shape[1]
-num_deptos = df['DEPARTAMENTO'].nunique()
-num_mpios = df['MUNICIPIO'].nunique()
+zni = obtener_pipeline()
+cache_figuras = obtener_cache_figuras()
 
-# Cálculo de Totales y Deltas
-tot_ac_25 = df_activa[2025].tolist()[0]
-tot_ac_24 = df_activa[2024].tolist()[0]
-tot_ac_23 = df_activa[2023].tolist()[0]
-tot_ac_22 = df_activa[2022].tolist()[0]
-tot_ac_21 = df_activa[2021].tolist()[0]
-delta_25 = (tot_ac_25 - tot_ac_24)/tot_ac_24*100
-delta_24 = (tot_ac_24 - tot_ac_23)/tot_ac_23*100
-delta_23 = (tot_ac_23 - tot_ac_22)/tot_ac_22*100
-delta_22 = (tot_ac_22 - tot_ac_21)/tot_ac_21*100
+df = zni.df
+resumen = zni.resumen
+df_pivote = zni.df_pivote
+df_agrupado = zni.df_agrupado
+kpis = zni.kpis
+departamentos = zni.departamentos
+indice_deptos = zni.indice_deptos
 
+# Las figuras se guardan por versión de los datos: una copia nueva invalida todas
+version_datos = zni.version
 
-# Ordenar departamentos por el año 2020 de mayor a menor
-df_depto_anios = df_colombia_continental.groupby(['DEPARTAMENTO', 'AÑO SERVICIO'])['ENERGÍA ACTIVA'].sum().reset_index()
-departamentos = df_depto_anios['DEPARTAMENTO'].unique().tolist()
+# Número de años que se muestran en los indicadores
+N_ANIOS_KPI = 4
 
 
 
@@ -98,23 +81,56 @@ with st.container(border=True):
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric('Número de Variables', variables, border=True)
+        st.metric('Número de Variables', resumen['variables'], border=True)
 
     with col2:
-        st.metric('Número de Observaciones', filas, border=True)
+        st.metric('Número de Observaciones', resumen['filas'], border=True)
 
     with col3:
-        st.metric('Número de Departamentos', num_deptos, border=True)
+        st.metric('Número de Departamentos', resumen['num_deptos'], border=True)
 
     with col4:
-        st.metric('Número de Municipios', num_mpios, border=True)
+        st.metric('Número de Municipios', resumen['num_mpios'], border=True)
 
     if st.checkbox('Mostrar detalles el Dataset'):
         st.write('Conjuto de datos obtendios del Portal de Datos Abiertos del Gobierno Nacional de Colombia')
         st.write('Disponible en https://www.datos.gov.co/Minas-y-Energ-a/Estado-de-la-prestaci-n-del-servicio-de-energ-a-en/3ebi-d83g/about_data')
+        st.caption(f"Copia local descargada el {df.attrs['fuente']['descargado']}")
 
     with st.expander('Ver conjunto de datos completo'):
-        st.dataframe(df)
+        # Solo se envía al navegador la página visible
+        visor = zni.visor
+        filtros = {}
+
+        col_f1, col_f2, col_f3 = st.columns(3)
+        with col_f1:
+            depto_visor = st.selectbox('Departamento', ['Todos'] + visor.valores('DEPARTAMENTO'), key='visor_depto')
+            if depto_visor != 'Todos':
+                filtros['DEPARTAMENTO'] = depto_visor
+        with col_f2:
+            mpio_visor = st.selectbox('Municipio', ['Todos'] + visor.valores('MUNICIPIO'), key='visor_mpio')
+            if mpio_visor != 'Todos':
+                filtros['MUNICIPIO'] = mpio_visor
+        with col_f3:
+            orden_visor = st.selectbox('Ordenar por', ['(sin orden)'] + df.columns.tolist(), key='visor_orden')
+
+        col_p1, col_p2, col_p3 = st.columns(3)
+        with col_p1:
+            ascendente = st.radio('Sentido', ['Ascendente', 'Descendente'], horizontal=True, key='visor_sentido') == 'Ascendente'
+        with col_p2:
+            tam_pagina = st.selectbox('Filas por página', [25, 50, 100, 500], index=1, key='visor_tam')
+        with col_p3:
+            num_pagina = st.number_input('Página', min_value=1, value=1, step=1, key='visor_pagina')
+
+        df_pagina, total_paginas, total_filas = visor.pagina(
+            num_pagina,
+            tam_pagina,
+            filtros,
+            None if orden_visor == '(sin orden)' else orden_visor,
+            ascendente
+        )
+        st.dataframe(df_pagina)
+        st.caption(f'Página {min(num_pagina, total_paginas)} de {total_paginas} ({total_filas} filas)')
 
     with st.expander('Ver Datos de Energía Activa por Departamento y Año'):
         st.dataframe(df_pivote)
@@ -131,32 +147,37 @@ with st.container(border=True):
         'Selecciona un departamento:',
         options=departamentos
     )
-    condicion_filtro = df_depto_anios['DEPARTAMENTO'] == depto_selec
-    df_departamento = df_depto_anios[condicion_filtro]
-
-    # Crear gráfico de barras horizontales
-    # 1 Crear el objeto Figure
-    fig_barras = go.Figure()
-
-    # 2 Agregar las barras a fig_barras que es el objeto Figure
-    fig_barras.add_trace(go.Bar(
-        x=df_departamento['ENERGÍA ACTIVA'],
-        y=df_departamento['AÑO SERVICIO'].astype(str),
-        orientation='h',
-        marker_color='#4E7F96',
-        text=df_departamento['ENERGÍA ACTIVA'],
-        texttemplate='%{text:,.0f}',
-        textposition='auto',
-    ))
-
-    # 3. Actualizar el objeto Figure con el diseño deseado
-    fig_barras.update_layout(
-        height=400,
-        xaxis_title='Energía Activa (kWh)',
-        yaxis_title='Año',
-        showlegend=False,
-        yaxis={'categoryorder': 'category ascending'}
-    )
+
+    def construir_barras_depto():
+        df_departamento = indice_deptos[depto_selec]
+
+        # Crear gráfico de barras horizontales
+        # 1 Crear el objeto Figure
+        fig_barras = go.Figure()
+
+        # 2 Agregar las barras a fig_barras que es el objeto Figure
+        fig_barras.add_trace(go.Bar(
+            x=df_departamento['ENERGÍA ACTIVA'],
+            y=df_departamento['AÑO SERVICIO'].astype(str),
+            orientation='h',
+            marker_color='#4E7F96',
+            text=df_departamento['ENERGÍA ACTIVA'],
+            texttemplate='%{text:,.0f}',
+            textposition='auto',
+        ))
+
+        # 3. Actualizar el objeto Figure con el diseño deseado
+        fig_barras.update_layout(
+            height=400,
+            xaxis_title='Energía Activa (kWh)',
+            yaxis_title='Año',
+            showlegend=False,
+            yaxis={'categoryorder': 'category ascending'}
+        )
+        return fig_barras
+
+    # Solo este gráfico depende de la selección
+    fig_barras = cache_figuras.obtener('barras_depto', depto_selec, version_datos, construir_barras_depto)
 
     # Mostrar
     st.plotly_chart(fig_barras, use_container_width=True)
@@ -167,49 +188,34 @@ with st.container(border=True):
 
 with st.container(border=True):
     st.html('<h2><font color=#3D6E85>Indicadores de Energía Activa por año en Millones de kWh</h2>')
-    col5, col6, col7, col8 = st.columns(4)
-    col5.metric(
-        label='2022',
-        value= round(tot_ac_22/1000000,2),
-        delta= f'{round(delta_22,2)}%',
-        help='Este es un valor de ejemplo',
-        border=True
-    )
-
-    col6.metric(
-        label='2023',
-        value= round(tot_ac_23/1000000,2),
-        delta= f'{round(delta_23,2)}%',
-        border=True
-    )
-
-    col7.metric(
-        label='2024',
-        value= round(tot_ac_24/1000000,2),
-        delta= f'{round(delta_24,2)}%',
-        border=True
-    )
-
-    col8.metric(
-        label='2025',
-        value= round(tot_ac_25/1000000,2),
-        delta= f'{round(delta_25,2)}%',
-        border=True
-    )
+    # Los últimos N_ANIOS_KPI años disponibles, sin importar cuáles sean
+    kpis_recientes = kpis.tail(N_ANIOS_KPI)
+    columnas_kpi = st.columns(len(kpis_recientes))
+
+    for i, (anio, total, delta) in enumerate(kpis_recientes.itertuples(index=False)):
+        columnas_kpi[i].metric(
+            label=str(anio),
+            value= round(total/1000000,2),
+            delta= f'{round(delta,2)}%' if pd.notna(delta) else None,
+            help='Este es un valor de ejemplo' if i == 0 else None,
+            border=True
+        )
 
     with st.container(border=True):
-        df_activa = df_activa[[2022,2023,2024,2025]].T
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=df_activa.index,
-                y=df_activa[0],
-                mode='lines+markers',
-                line=dict(color="#4E7F96")
-                )
-        )
-        fig.update_layout(height=300)
+        def construir_linea_kpis():
+            fig = go.Figure()
+            fig.add_trace(
+                go.Scatter(
+                    x=kpis_recientes['AÑO SERVICIO'],
+                    y=kpis_recientes['TOTAL'],
+                    mode='lines+markers',
+                    line=dict(color="#4E7F96")
+                    )
+            )
+            fig.update_layout(height=300)
+            return fig
+
+        fig = cache_figuras.obtener('linea_kpis', N_ANIOS_KPI, version_datos, construir_linea_kpis)
         st.plotly_chart(fig, config = {'scrollZoom': False})
         st.caption('*Fuente: Datos Abiertos del Gobierno Nacional de Colombia*')
 
@@ -222,19 +228,18 @@ with st.container(border=True):
     st.html('<font size=5><font color=#3D6E85>Gráficos de Energía Activa y Reactiva por Municipio</font>')
     col9, col10 = st.columns(2)
 
-    with col9:
-        # Del df_afrupado, odenamos por Energía Activa descendente y elegimos los 5 primeros
-        df_mayores = df_agrupado.sort_values(by='ENERGÍA ACTIVA', ascending=False).head(5)
+    def construir_top_municipios(columna, titulo, etiqueta):
+        # Del df_afrupado, odenamos por la energía descendente y elegimos los 5 primeros
+        df_mayores = df_agrupado.sort_values(by=columna, ascending=False).head(5)
 
         # 1. Crear el Objeto y agregar graficos
         fig = px.bar(
             df_mayores,
             x = 'MUNICIPIO',
-            y = 'ENERGÍA ACTIVA',
+            y = columna,
             color = 'DEPARTAMENTO',
-            title = 'Top 5 Municipios - Energía Activa',
-            labels = {'MUNICIPIO': 'Municipios', 'ENERGÍA ACTIVA': 'Energía Activa (kWh)', 'DEPARTAMENTO': 'Departamento'},
-            #color_discrete_sequence=px.colors.sequential.Tealgrn,
+            title = titulo,
+            labels = {'MUNICIPIO': 'Municipios', columna: etiqueta, 'DEPARTAMENTO': 'Departamento'},
             height=500
         )
 
@@ -243,69 +248,57 @@ with st.container(border=True):
             textposition='outside',
             texttemplate='%{y:,.0f}'
             )
+        return fig
+
+    with col9:
+        fig = cache_figuras.obtener(
+            'top_municipios', 'ENERGÍA ACTIVA', version_datos,
+            lambda: construir_top_municipios('ENERGÍA ACTIVA', 'Top 5 Municipios - Energía Activa', 'Energía Activa (kWh)')
+        )
 
         # 3. Mostrar
         st.plotly_chart(fig, use_container_width=True)
 
         with col10:
-            # Del df_afrupado, odenamos por Energía Activa descendente y elegimos los 5 primeros
-            df_mayores = df_agrupado.sort_values(by='ENERGÍA REACTIVA', ascending=False).head(5)
-
-            # 1. Crear el Objeto y agregar graficos
-            fig = px.bar(
-                df_mayores,
-                x = 'MUNICIPIO',
-                y = 'ENERGÍA REACTIVA',
-                color = 'DEPARTAMENTO',
-                title = 'Top 5 Municipios - Energía Reactiva',
-                labels = {'MUNICIPIO': 'Municipios', 'ENERGÍA REACTIVA': 'Energía Reactiva (kWh)', 'DEPARTAMENTO': 'Departamento'},
-                #color_discrete_sequence=px.colors.sequential.Purpor,
-                height=500
+            fig = cache_figuras.obtener(
+                'top_municipios', 'ENERGÍA REACTIVA', version_datos,
+                lambda: construir_top_municipios('ENERGÍA REACTIVA', 'Top 5 Municipios - Energía Reactiva', 'Energía Reactiva (kWh)')
             )
 
-            # 2. Actualización del diseño
-            fig.update_traces(
-                textposition='outside',
-                texttemplate='%{y:,.0f}'
-                )
-
             # 3. Mostrar
             st.plotly_chart(fig, use_container_width=True)
 
 with st.container(border=True):
     st.html('<font size=5><font color=#3D6E85>Gráficos de Energía Activa y Reactiva por Departamento</font>')
 
-    col11, col12 = st.columns(2)
-    with col11:
-        df_depto_activa = df_agrupado.groupby('DEPARTAMENTO')['ENERGÍA ACTIVA'].sum().reset_index()
-        df_depto_activa = df_depto_activa.sort_values(by='ENERGÍA ACTIVA', ascending=False).head(5)
+    def construir_torta_deptos(columna, titulo):
+        df_depto = df_agrupado.groupby('DEPARTAMENTO', observed=True)[columna].sum().reset_index()
+        df_depto = df_depto.sort_values(by=columna, ascending=False).head(5)
 
          # 1. Crear el Objeto y agregar graficos
-        fig_act = px.pie(
-            df_depto_activa,
+        return px.pie(
+            df_depto,
             names = 'DEPARTAMENTO',
-            values = 'ENERGÍA ACTIVA',
-            title = 'Top 5 Departamentos - Energía Activa',
+            values = columna,
+            title = titulo,
             hole=0.4
         )
-        # 2. Actualización del diseño
+
+    col11, col12 = st.columns(2)
+    with col11:
+        fig_act = cache_figuras.obtener(
+            'torta_deptos', 'ENERGÍA ACTIVA', version_datos,
+            lambda: construir_torta_deptos('ENERGÍA ACTIVA', 'Top 5 Departamentos - Energía Activa')
+        )
 
         # 3. Mostrar
         st.plotly_chart(fig_act, use_container_width=True)
 
     with col12:
-        df_depto_reactiva = df_agrupado.groupby('DEPARTAMENTO')['ENERGÍA REACTIVA'].sum().reset_index()
-        df_depto_reactiva = df_depto_reactiva.sort_values(by='ENERGÍA REACTIVA', ascending=False).head(5)
-
-         # 1. Crear el Objeto y agregar graficos
-        fig_react = px.pie(
-            df_depto_reactiva,
-            names = 'DEPARTAMENTO',
-            values = 'ENERGÍA REACTIVA',
-            title = 'Top 5 Departamentos - Energía Reactiva',
-            hole=0.4
+        fig_react = cache_figuras.obtener(
+            'torta_deptos', 'ENERGÍA REACTIVA', version_datos,
+            lambda: construir_torta_deptos('ENERGÍA REACTIVA', 'Top 5 Departamentos - Energía Reactiva')
         )
-        # 2. Actualización del diseño
 
         # 3. Mostrar
         st.plotly_chart(fig_react, use_container_width=True)
@@ -0,0 +1,133 @@
+"""
+Tiempo de importación de los módulos del proyecto, por módulo y por paquete.
+
+Cada módulo se importa en un proceso nuevo con ``python -X importtime`` y se
+lee el informe que Python escribe en stderr: el tiempo propio y acumulado de
+cada módulo importado. Se repite varias veces y se conserva el menor tiempo de
+cada módulo. El resultado resume también el tiempo propio por paquete de
+primer nivel (matplotlib, seaborn, plotly, ...), para ver qué dependencia
+pesa en el arranque.
+
+Con ``--comparar`` se compara contra una ejecución anterior y el proceso
+termina con código 1 si algún módulo tarda más que ``--umbral`` por ciento
+sobre lo anterior, para detectar regresiones en el arranque.
+
+Uso:
+    python -m benchmarks.bench_importacion --salida bench_importacion.json
+    python -m benchmarks.bench_importacion --comparar bench_anterior.json --umbral 25
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+# Módulos que se miden por defecto (importarlos no debe calcular ni dibujar nada)
+MODULOS = ['src.code', 'src.visualization', 'src.render', 'src.zni', 'src.historial']
+
+# Raíz del proyecto, desde donde se importan los módulos
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos más lentos (por tiempo acumulado) que se guardan de cada medición
+TOP_MODULOS = 25
+
+
+def leer_importtime(texto):
+    """Filas de un informe de ``-X importtime``: módulo, nivel y tiempos propio y acumulado en s."""
+    filas = []
+    for linea in texto.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        # El nombre viene con un espacio y dos más por cada nivel de anidamiento
+        nombre = nombre[1:]
+        filas.append({
+            'modulo': nombre.strip(),
+            'nivel': (len(nombre) - len(nombre.lstrip())) // 2,
+            'propio_s': int(propio) / 1e6,
+            'acumulado_s': int(acumulado) / 1e6,
+        })
+    return filas
+
+
+def medir_importacion(modulo, repeticiones=3):
+    """Importa ``modulo`` en ``repeticiones`` procesos nuevos y resume el menor tiempo de cada módulo."""
+    mejores = {}
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            cwd=RAIZ, capture_output=True, text=True,
+        )
+        if proceso.returncode != 0:
+            raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+        for fila in leer_importtime(proceso.stderr):
+            previa = mejores.get(fila['modulo'])
+            if previa is None or fila['acumulado_s'] < previa['acumulado_s']:
+                mejores[fila['modulo']] = fila
+
+    paquetes = {}
+    for fila in mejores.values():
+        paquete = fila['modulo'].split('.')[0]
+        paquetes[paquete] = paquetes.get(paquete, 0) + fila['propio_s']
+    paquetes = dict(sorted(paquetes.items(), key=lambda p: p[1], reverse=True))
+
+    return {
+        'modulo': modulo,
+        'segundos': round(mejores[modulo]['acumulado_s'], 6),
+        'num_modulos': len(mejores),
+        'paquetes': {p: round(s, 6) for p, s in paquetes.items()},
+        'modulos': sorted(mejores.values(), key=lambda f: f['acumulado_s'], reverse=True)[:TOP_MODULOS],
+    }
+
+
+def comparar(actual, anterior, umbral):
+    """Imprime la variación por módulo y devuelve los que empeoraron más de ``umbral`` por ciento."""
+    previos = {r['modulo']: r['segundos'] for r in anterior['resultados']}
+    regresiones = []
+    for r in actual['resultados']:
+        antes = previos.get(r['modulo'])
+        if antes:
+            cambio = (r['segundos'] - antes) / antes * 100
+            marca = '  <-- regresión' if cambio > umbral else ''
+            print(f"{r['modulo']:<20} {antes:8.3f}s -> {r['segundos']:8.3f}s ({cambio:+.1f}%){marca}")
+            if cambio > umbral:
+                regresiones.append(r['modulo'])
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de importación de los módulos del proyecto.')
+    parser.add_argument('--modulos', nargs='+', default=MODULOS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', default='bench_importacion.json')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+    parser.add_argument('--umbral', type=float, default=20, help='aumento (%%) que cuenta como regresión')
+    args = parser.parse_args()
+
+    resultado = {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'resultados': [],
+    }
+    for modulo in args.modulos:
+        medida = medir_importacion(modulo, args.repeticiones)
+        resultado['resultados'].append(medida)
+        principales = ', '.join(f'{p} {s:.3f}s' for p, s in list(medida['paquetes'].items())[:4])
+        print(f"{modulo:<20} {medida['segundos']:8.3f}s  {medida['num_modulos']:>5} módulos  ({principales})")
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f'Resultados guardados en {args.salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(resultado, json.load(f), args.umbral)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
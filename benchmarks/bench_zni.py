@@ -0,0 +1,185 @@
+"""
+Pruebas de rendimiento del pipeline ZNI (src/zni.py) con datos sintéticos.
+
+Genera archivos con el mismo esquema del CSV de ZNI (nombres con tildes,
+variantes de San Andrés, cifras con ',' como separador de miles) a varias
+escalas y mide tiempo y memoria pico de cada etapa. No usa la red.
+
+Uso:
+    python -m benchmarks.bench_zni --escalas 1 10 100 --salida bench_zni.json
+    python -m benchmarks.bench_zni --comparar bench_anterior.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.zni import (
+    DEPTOS_EXCLUIDOS, calcular_kpis, construir_cubo, leer_zni, normalizar_nombres
+)
+
+# Filas del conjunto a escala 1 (aprox. el tamaño del archivo publicado)
+FILAS_BASE = 25_000
+
+# Departamentos y municipios de ejemplo, con y sin tildes como en la fuente
+LUGARES = {
+    'AMAZONAS': ['LETICIA', 'PUERTO NARIÑO', 'LA PEDRERA', 'TARAPACÁ'],
+    'CAQUETÁ': ['SOLANO', 'CARTAGENA DEL CHAIRÁ', 'SAN VICENTE DEL CAGUÁN'],
+    'CAUCA': ['GUAPI', 'TIMBIQUÍ', 'LÓPEZ DE MICAY'],
+    'CHOCÓ': ['QUIBDÓ', 'BAHÍA SOLANO', 'ACANDÍ', 'NUQUÍ', 'JURADÓ', 'BOJAYÁ'],
+    'GUAINÍA': ['INÍRIDA', 'BARRANCO MINAS'],
+    'GUAVIARE': ['SAN JOSÉ DEL GUAVIARE', 'MIRAFLORES'],
+    'META': ['MAPIRIPÁN', 'PUERTO GAITÁN'],
+    'NARIÑO': ['TUMACO', 'EL CHARCO', 'MOSQUERA', 'OLAYA HERRERA'],
+    'PUTUMAYO': ['PUERTO LEGUÍZAMO'],
+    'VAUPÉS': ['MITÚ', 'CARURÚ', 'TARAIRA'],
+    'VICHADA': ['PUERTO CARREÑO', 'CUMARIBO', 'LA PRIMAVERA'],
+    DEPTOS_EXCLUIDOS[0]: ['SAN ANDRÉS'],
+    DEPTOS_EXCLUIDOS[1]: ['PROVIDENCIA'],
+    DEPTOS_EXCLUIDOS[2]: ['PROVIDENCIA', 'SAN ANDRÉS'],
+}
+
+ANIOS = list(range(2021, 2026))
+
+
+def generar_zni(escala=1, semilla=0):
+    """DataFrame sintético con el esquema del CSV de ZNI (columnas como texto)."""
+    rng = np.random.default_rng(semilla)
+    n = int(FILAS_BASE * escala)
+
+    pares = [(d, m) for d, municipios in LUGARES.items() for m in municipios]
+    lugar = rng.integers(0, len(pares), n)
+    deptos = np.array([d for d, _ in pares], dtype=object)[lugar]
+    mpios = np.array([m for _, m in pares], dtype=object)[lugar]
+
+    activa = rng.integers(0, 5_000_000, n)
+    reactiva = rng.integers(0, 900_000, n)
+    potencia = rng.random(n) * 5_000
+
+    return pd.DataFrame({
+        'DEPARTAMENTO': deptos,
+        'MUNICIPIO': mpios,
+        'LOCALIDAD': np.char.add('LOCALIDAD ', rng.integers(0, 400, n).astype(str)),
+        'AÑO SERVICIO': rng.choice(ANIOS, n),
+        'MES SERVICIO': rng.integers(1, 13, n),
+        'ENERGÍA ACTIVA': [f'{v:,}' for v in activa],
+        'ENERGÍA REACTIVA': [f'{v:,}' for v in reactiva],
+        'POTENCIA MÁXIMA': [f'{v:,.2f}' for v in potencia],
+    })
+
+
+def _medir(funcion, repeticiones):
+    """Ejecuta ``funcion`` y devuelve (resultado, mejor tiempo en s, memoria pico en bytes).
+
+    El tiempo se mide en ``repeticiones`` ejecuciones sin tracemalloc, que
+    vuelve más lenta cada asignación; la memoria pico sale de una ejecución
+    aparte con tracemalloc activo.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return resultado, min(tiempos), pico
+
+
+def medir_escala(escala, repeticiones=3, dir_trabajo=None):
+    """Mide cada etapa del pipeline sobre un CSV sintético de la escala dada."""
+    with tempfile.TemporaryDirectory(dir=dir_trabajo) as tmp:
+        ruta = os.path.join(tmp, f'zni_x{escala}.csv')
+        generar_zni(escala).to_csv(ruta, index=False)
+
+        etapas = []
+
+        def registrar(nombre, funcion):
+            resultado, segundos, pico = _medir(funcion, repeticiones)
+            etapas.append({'etapa': nombre, 'segundos': round(segundos, 6), 'pico_bytes': int(pico)})
+            return resultado
+
+        df = registrar('parse', lambda: leer_zni(ruta))
+
+        def limpiar():
+            limpio = df.copy()
+            limpio['DEPARTAMENTO'] = normalizar_nombres(limpio['DEPARTAMENTO'])
+            limpio['MUNICIPIO'] = normalizar_nombres(limpio['MUNICIPIO'])
+            return limpio
+
+        df = registrar('clean', limpiar)
+        continental = registrar('filter', lambda: df[~df['DEPARTAMENTO'].isin(DEPTOS_EXCLUIDOS)])
+        cubo = registrar('groupby', lambda: construir_cubo(continental))
+        registrar('pivot', lambda: cubo.pivot_table(
+            index='DEPARTAMENTO', columns='AÑO SERVICIO', values=['ENERGÍA ACTIVA'],
+            aggfunc='sum', observed=True
+        ))
+        registrar('kpi', lambda: calcular_kpis(cubo))
+
+        return {
+            'escala': escala,
+            'filas': int(df.shape[0]),
+            'bytes_df': int(df.memory_usage(deep=True).sum()),
+            'etapas': etapas,
+        }
+
+
+def comparar(actual, anterior):
+    """Imprime la variación de tiempo por escala y etapa frente a un resultado anterior."""
+    previos = {
+        (r['escala'], e['etapa']): e['segundos']
+        for r in anterior['resultados'] for e in r['etapas']
+    }
+    for r in actual['resultados']:
+        for e in r['etapas']:
+            antes = previos.get((r['escala'], e['etapa']))
+            if antes:
+                cambio = (e['segundos'] - antes) / antes * 100
+                print(f"x{r['escala']:<4} {e['etapa']:<8} {antes:9.4f}s -> {e['segundos']:9.4f}s ({cambio:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rendimiento del pipeline ZNI con datos sintéticos.')
+    parser.add_argument('--escalas', type=float, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', default='bench_zni.json')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+    args = parser.parse_args()
+
+    resultado = {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'resultados': [],
+    }
+    for escala in args.escalas:
+        escala = int(escala) if float(escala).is_integer() else escala
+        medida = medir_escala(escala, args.repeticiones)
+        resultado['resultados'].append(medida)
+        for e in medida['etapas']:
+            print(f"x{escala:<4} {medida['filas']:>10} filas  {e['etapa']:<8} {e['segundos']:9.4f}s  {e['pico_bytes'] / 1e6:9.1f} MB")
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f'Resultados guardados en {args.salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
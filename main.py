@@ -1 +1,3 @@
 from src import visualization
+
+visualization.mostrar_todos()
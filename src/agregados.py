@@ -0,0 +1,286 @@
+"""
+Agregados del conjunto de Cobertura Móvil compartidos por code.py y modelo.py.
+
+El agregado base se calcula una sola vez al nivel más fino que usan los
+análisis (periodo, departamento, municipio, CPOB y tecnología). Las demás
+tablas (df_actual, df_resumen, df_temp, df_modelo, ...) se obtienen de él con
+agregaciones mucho más pequeñas que volver a agrupar todas las filas.
+"""
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .carga import COLS_AREA
+
+# Nivel más fino de agregación
+CLAVES_BASE = ['ANNO', 'TRIMESTRE', 'DEPARTAMENTO', 'MUNICIPIO', 'CPOB', 'TECNOLOGIA']
+
+# Nombre de cada operador, en el orden de COLS_AREA
+OPERADORES = [col.replace('AREA_COB_', '') for col in COLS_AREA]
+
+# Porcentaje del área del CPOB cubierta por cada operador
+COLS_PCT = ['PCT_' + operador for operador in OPERADORES]
+
+# Agregado base ya calculado, por DataFrame de origen (se libera junto con él)
+_CACHE_BASE = {}
+
+
+def _calcular_base(df):
+    agregaciones = {
+        'PERIODO_ID': 'first',
+        'AREA_CPOB': 'first',  # el área total urbana es la misma
+        **{col: 'sum' for col in COLS_AREA},
+        'NIVEL_SENAL': 'mean',
+        '_FILA': 'min',
+    }
+    return (
+        df.assign(_FILA=np.arange(len(df)))
+        .groupby(CLAVES_BASE, as_index=False, observed=True)
+        .agg(agregaciones)
+    )
+
+
+def agregado_base(df):
+    """Agregado de ``df`` por CLAVES_BASE, calculado una vez y reutilizado.
+
+    Contiene AREA_CPOB ('first'), la suma de las cuatro áreas de cobertura, el
+    promedio de NIVEL_SENAL, PERIODO_ID y _FILA (primera fila de origen de cada
+    grupo, para poder repetir el 'first' al agregar más). Queda ordenado por
+    periodo, así que se puede cortar con ``filtrar_periodo``.
+
+    El resultado se comparte entre llamadas: no debe modificarse, ni tampoco
+    ``df`` después de calcularlo.
+    """
+    clave = id(df)
+    if clave not in _CACHE_BASE:
+        _CACHE_BASE[clave] = _calcular_base(df)
+        weakref.finalize(df, _CACHE_BASE.pop, clave, None)
+    return _CACHE_BASE[clave]
+
+
+def agregar_desde_base(base, claves, primero=('AREA_CPOB',), sumas=COLS_AREA):
+    """Agrega el agregado base a un nivel más grueso (``claves``).
+
+    Las columnas de ``sumas`` se suman y las de ``primero`` toman el valor de
+    la primera fila del conjunto original, igual que un 'first' sobre ``df``.
+    """
+    agregaciones = {col: 'first' for col in primero}
+    agregaciones.update({col: 'sum' for col in sumas})
+
+    if primero:
+        # Para que 'first' respete el orden de las filas originales
+        base = base.sort_values('_FILA', kind='stable')
+
+    return base.groupby(claves, as_index=False, observed=True).agg(agregaciones)
+
+
+def operador_max(df, cols=COLS_AREA, sin_cobertura=None):
+    """Operador con mayor área de cobertura en cada fila y esa área, en una sola pasada.
+
+    Hace ``argmax`` sobre la matriz de las columnas ``cols`` y devuelve
+    (OPERADOR_MAX como categórica, AREA_COB_MAX). Los nombres de operador son
+    las columnas sin el prefijo 'AREA_COB_'. Los valores nulos se ignoran.
+
+    Reglas deterministas:
+    - Empates: gana la primera columna de ``cols``, igual que ``idxmax``.
+    - Filas sin cobertura (todo cero o nulo): con ``sin_cobertura=None`` se
+      asigna el primer operador, igual que ``idxmax``; si se da una etiqueta
+      (p. ej. 'NINGUNO') se usa esa etiqueta.
+    """
+    valores = df[cols].to_numpy(dtype='float64')
+    nulos = np.isnan(valores)
+    if nulos.any():
+        valores = np.where(nulos, -np.inf, valores)
+
+    codigos = valores.argmax(axis=1)
+    maximos = valores[np.arange(len(valores)), codigos]
+    maximos[np.isneginf(maximos)] = np.nan  # filas con todas las áreas nulas
+
+    categorias = [col.replace('AREA_COB_', '').upper() for col in cols]
+    if sin_cobertura is not None:
+        categorias.append(sin_cobertura)
+        codigos = np.where(maximos > 0, codigos, len(cols))
+
+    operador = pd.Series(
+        pd.Categorical.from_codes(codigos, categories=categorias),
+        index=df.index,
+        name='OPERADOR_MAX',
+    )
+    return operador, pd.Series(maximos, index=df.index, name='AREA_COB_MAX')
+
+
+def top_k_por_grupo(df, claves, columna, k=1, ascendente=False, desempate='primero'):
+    """Las ``k`` filas con mayor ``columna`` de cada grupo de ``claves``.
+
+    Reemplaza ``df.loc[df.groupby(claves)[columna].idxmax()]`` trabajando con
+    el número de grupo de cada fila. Con ``ascendente=True`` se toman las
+    menores.
+
+    ``desempate`` decide entre filas con el mismo valor: 'primero' (la que
+    aparece antes en ``df``, igual que ``idxmax``), 'ultimo', o el nombre de
+    una columna, cuyo menor valor gana. Los nulos de ``columna`` quedan al
+    final de su grupo. El resultado conserva el índice de ``df`` y sale
+    ordenado por grupo y luego por posición dentro del grupo.
+    """
+    agrupado = df.groupby(claves, observed=True, sort=True)
+    grupos = agrupado.ngroup().to_numpy()
+    valores = df[columna].to_numpy(dtype='float64')
+    # Se busca siempre el máximo; los nulos pierden contra cualquier valor
+    valores = np.where(np.isnan(valores), -np.inf, -valores if ascendente else valores)
+    validas = grupos >= 0 if grupos.dtype.kind != 'f' else ~np.isnan(grupos)
+    if not validas.all():
+        # Filas con clave nula: groupby las descarta
+        posiciones = np.flatnonzero(validas)
+        grupos, valores = grupos[validas].astype(np.int64), valores[validas]
+    else:
+        posiciones = np.arange(len(df))
+
+    if k == 1 and desempate in ('primero', 'ultimo'):
+        # Reducción por segmentos: máximo de cada grupo y la primera (o última)
+        # fila que lo alcanza, sin ordenar
+        maximos = np.full(agrupado.ngroups, -np.inf)
+        np.maximum.at(maximos, grupos, valores)
+        candidatas = np.flatnonzero(valores == maximos[grupos])
+        if desempate == 'primero':
+            elegidas = np.full(agrupado.ngroups, len(posiciones))
+            np.minimum.at(elegidas, grupos[candidatas], candidatas)
+        else:
+            elegidas = np.full(agrupado.ngroups, -1)
+            np.maximum.at(elegidas, grupos[candidatas], candidatas)
+        return df.iloc[posiciones[elegidas]]
+
+    if desempate == 'primero':
+        secundaria = np.arange(len(posiciones))
+    elif desempate == 'ultimo':
+        secundaria = -np.arange(len(posiciones))
+    else:
+        serie = df[desempate]
+        secundaria = serie.cat.codes.to_numpy() if serie.dtype == 'category' else serie.to_numpy()
+        secundaria = secundaria[posiciones]
+
+    # Un solo ordenamiento por (grupo, valor descendente, desempate, posición);
+    # lexsort usa la última clave como principal
+    orden = np.lexsort((np.arange(len(posiciones)), secundaria, -valores, grupos))
+    grupos_ordenados = grupos[orden]
+    inicio = np.flatnonzero(np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1]])
+    rango = np.arange(len(orden)) - np.repeat(inicio, np.diff(np.r_[inicio, len(orden)]))
+    return df.iloc[posiciones[orden[rango < k]]]
+
+
+def moda_por_grupo(df, claves, columna, desempate='primero'):
+    """Valor más frecuente de ``columna`` en cada grupo de ``claves``.
+
+    Reemplaza ``groupby(claves)[columna].agg(lambda x: x.value_counts().idxmax())``
+    sin llamar a Python por grupo: con los códigos de grupo y de categoría arma
+    la matriz de conteos (grupo x categoría) en una pasada y toma el argmax de
+    cada fila. Sirve para cualquier columna categórica (OPERADOR_MAX,
+    TECNOLOGIA, ...) y cualquier nivel (departamento, municipio, CPOB).
+
+    Empates: con ``desempate='primero'`` gana el valor que aparece antes dentro
+    del grupo (igual que ``value_counts`` sobre texto); con 'categoria', el
+    primero en el orden de las categorías. Los nulos no se cuentan.
+
+    Devuelve un DataFrame con ``claves`` y ``columna`` (categórica), una fila
+    por grupo y en el orden de ``groupby``.
+    """
+    agrupado = df.groupby(claves, observed=True, sort=True)
+    grupos = agrupado.ngroup().to_numpy()
+    serie = df[columna]
+    if serie.dtype == 'category':
+        codigos, categorias = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, categorias = pd.factorize(serie, sort=True)
+
+    n_grupos, n_cat = agrupado.ngroups, len(categorias)
+    validas = (codigos >= 0) & (grupos >= 0)
+    posiciones = np.flatnonzero(validas)
+    celdas = grupos[posiciones].astype(np.int64) * n_cat + codigos[posiciones]
+
+    conteos = np.bincount(celdas, minlength=n_grupos * n_cat).reshape(n_grupos, n_cat)
+    if desempate == 'primero':
+        # Entre las categorías empatadas gana la de primera aparición más temprana
+        primera = np.full(n_grupos * n_cat, len(df))
+        np.minimum.at(primera, celdas, posiciones)
+        primera = primera.reshape(n_grupos, n_cat)
+        empatadas = conteos == conteos.max(axis=1, keepdims=True)
+        ganadora = np.where(empatadas, primera, len(df)).argmin(axis=1)
+    else:
+        ganadora = conteos.argmax(axis=1)
+    ganadora = np.where(conteos.max(axis=1) > 0, ganadora, -1)  # grupos sin valores
+
+    # Valores de las claves: los de la primera fila de cada grupo
+    primeras = np.full(n_grupos, len(df))
+    np.minimum.at(primeras, grupos[grupos >= 0].astype(np.int64), np.flatnonzero(grupos >= 0))
+    resultado = df[claves].iloc[primeras].reset_index(drop=True)
+    resultado[columna] = pd.Categorical.from_codes(ganadora, categories=categorias)
+    return resultado
+
+
+# Tablas derivadas que también actualiza historial.py trimestre a trimestre
+
+
+def serie_tecnologias(base):
+    """Áreas de cobertura sumadas por año, trimestre y tecnología, con PERIODO ('2024-T4')."""
+    df_temp = agregar_desde_base(base, ['ANNO', 'TRIMESTRE', 'TECNOLOGIA'], primero=())
+    df_temp['PERIODO'] = df_temp['ANNO'].astype(str) + '-T' + df_temp['TRIMESTRE'].astype(str)
+    return df_temp
+
+
+def formato_largo(df_temp):
+    """``df_temp`` con una fila por operador (OPERADOR, AREA_COBERTURA), como lo pide Plotly."""
+    df_long = df_temp.melt(
+        id_vars=['PERIODO', 'ANNO', 'TRIMESTRE', 'TECNOLOGIA'],
+        value_vars=COLS_AREA,
+        var_name='OPERADOR',
+        value_name='AREA_COBERTURA'
+    )
+    df_long['OPERADOR'] = df_long['OPERADOR'].str.replace('AREA_COB_', '', regex=False)
+    return df_long
+
+
+def porcentajes_4g(resumen):
+    """Filas 4G de ``resumen`` con el % del área del CPOB cubierta por cada operador.
+
+    Los porcentajes mayores a 100 (áreas de cobertura que superan el área del
+    CPOB) se ajustan a 100.
+    """
+    df_4g = resumen[resumen['TECNOLOGIA'] == '4G'].copy()
+    for col, pct in zip(COLS_AREA, COLS_PCT):
+        df_4g[pct] = (df_4g[col] / df_4g['AREA_CPOB']) * 100
+    df_4g[COLS_PCT] = df_4g[COLS_PCT].clip(upper=100)
+    return df_4g
+
+
+def maximos_cpob(df_4g):
+    """Porcentaje máximo de cada operador por DEPARTAMENTO y CPOB a través del tiempo."""
+    return (
+        df_4g.groupby(['DEPARTAMENTO', 'CPOB'], observed=True)[COLS_PCT]
+        .max()
+        .reset_index()
+    )
+
+
+def promedios_depto_periodo(df_4g):
+    """Porcentaje promedio de cada operador por departamento y periodo, con PERIODO ('2024-T4')."""
+    promedios = (
+        df_4g.groupby(['ANNO', 'TRIMESTRE', 'DEPARTAMENTO'], observed=True)[COLS_PCT]
+        .mean()
+        .reset_index()
+    )
+    promedios.insert(3, 'PERIODO', promedios['ANNO'].astype(str) + '-T' + promedios['TRIMESTRE'].astype(str))
+    return promedios
+
+
+def cuenta_sin_cobertura(df_sin):
+    """Número de CPOB distintos sin tecnología por año y departamento, de mayor a menor.
+
+    ``df_sin`` son las filas con TECNOLOGIA 'Ninguna' (puede tener repetidos).
+    """
+    cuenta = (
+        df_sin.groupby(['ANNO', 'DEPARTAMENTO'], observed=True)['CPOB']
+        .nunique()
+        .reset_index(name='NUM_CPOB_SIN_TEC')
+    )
+    return cuenta.sort_values(['ANNO', 'NUM_CPOB_SIN_TEC'], ascending=[True, False])
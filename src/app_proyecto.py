@@ -1,11 +1,15 @@
 import streamlit as st
-import plotly.graph_objects as go, plotly.express as px
-import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
+import os
+import sys
 
+# Permite ejecutar con `streamlit run src/app_proyecto.py` desde la raíz del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.carga import cargar_cobertura, filtrar_periodo
+from src.resumenes import conteo_grupos, dibujar_conteos
 
-df = pd.read_csv('./data/Datos_Cobertura Movil_1T_2023 a 4T_2024.csv', sep=';')
+
+df = cargar_cobertura()
 
 # Colores por operador (definición centralizada)
 color_dict = {
@@ -30,7 +34,7 @@ colores = {
 
 
 # Filtrar por año 2024 y trimestre 4
-df_filtrado = df[(df['ANNO'] == '2024') & (df['TRIMESTRE'] == '4')]
+df_filtrado = filtrar_periodo(df, 2024, 4)
 
 # Seleccionar los top departamentos por cantidad de registros
 top_deptos = df_filtrado['DEPARTAMENTO'].value_counts().head(30).index
@@ -42,13 +46,9 @@ df_top = df_filtrado[df_filtrado['DEPARTAMENTO'].isin(top_deptos)]
 
 fig, ax = plt.subplots(figsize=(14, 6))
 
-sns.countplot(
-    data=df_top,
-    x='DEPARTAMENTO',
-    hue='TECNOLOGIA',
-    palette=colores,
-    ax=ax
-)
+# Se dibuja desde los conteos por departamento y tecnología, no desde las filas
+conteo_top = conteo_grupos(df_top, 'DEPARTAMENTO', 'TECNOLOGIA')
+dibujar_conteos(ax, conteo_top, 'DEPARTAMENTO', 'TECNOLOGIA', palette=colores)
 
 ax.set_title('Distribución de Tecnologías en Top Departamentos (2024 - Trimestre 4)', fontsize=14, fontweight='bold')
 ax.set_xlabel('Departamento', fontsize=12)
@@ -0,0 +1,247 @@
+"""
+Caché en disco de las etapas del análisis de cobertura (src/code.py).
+
+Cada etapa (df, df_base, df_actual, ...) guarda su resultado en Parquet bajo
+una clave que combina:
+
+- la huella (SHA-1) del archivo de entrada,
+- el nombre y la versión del código de la etapa,
+- sus parámetros (p. ej. año y trimestre analizados),
+- las claves de las etapas de las que depende.
+
+Si cambia el archivo, el código de una etapa o un parámetro, cambia la clave
+de esa etapa y de todas las que dependen de ella, y se vuelven a calcular.
+Las demás se leen del disco.
+
+El tamaño total se limita: al pasarse de ``max_bytes`` se borran las entradas
+usadas hace más tiempo.
+
+Uso:
+    python -m src.cache_etapas info
+    python -m src.cache_etapas purgar [--etapa df_actual]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from functools import cached_property
+
+import pandas as pd
+
+# Carpeta y tamaño máximo de la caché (configurables por variable de entorno)
+DIR_CACHE_ETAPAS = os.environ.get('COBERTURA_DIR_ETAPAS', os.path.join('data', 'cache', 'etapas'))
+MAX_BYTES_ETAPAS = int(os.environ.get('COBERTURA_CACHE_MAX_MB', 500)) * 1024 * 1024
+
+# Huellas ya calculadas en este proceso, por (ruta, tamaño, fecha de modificación)
+_HUELLAS = {}
+
+
+def huella_archivo(ruta):
+    """SHA-1 del contenido de ``ruta``, leído por bloques.
+
+    Se recalcula solo si cambian el tamaño o la fecha de modificación.
+    """
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    if clave not in _HUELLAS:
+        sha1 = hashlib.sha1()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(bloque)
+        _HUELLAS[clave] = sha1.hexdigest()
+    return _HUELLAS[clave]
+
+
+class CacheEtapas:
+    """Resultados de etapas guardados como ``<etapa>-<clave>.parquet`` más sus metadatos en JSON.
+
+    Guarda DataFrames y Series; la fecha de modificación del Parquet marca el
+    último uso y decide qué se borra primero.
+    """
+
+    def __init__(self, directorio=DIR_CACHE_ETAPAS, max_bytes=MAX_BYTES_ETAPAS):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _rutas(self, etapa, clave):
+        base = os.path.join(self.directorio, f'{etapa}-{clave[:16]}')
+        return base + '.parquet', base + '.json'
+
+    def obtener(self, etapa, clave, calcular, descripcion=None):
+        """Resultado de ``etapa`` para ``clave``: del disco si existe, si no ``calcular()`` y se guarda."""
+        ruta_parquet, ruta_meta = self._rutas(etapa, clave)
+        try:
+            with open(ruta_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            resultado = pd.read_parquet(ruta_parquet)
+        except (OSError, ValueError):
+            meta = None
+
+        if meta is not None and meta.get('clave') == clave:
+            self.aciertos += 1
+            os.utime(ruta_parquet)  # último uso
+            if meta['tipo'] == 'Series':
+                resultado = resultado.iloc[:, 0].rename(meta['nombre'])
+            return resultado
+
+        self.fallos += 1
+        resultado = calcular()
+        self._guardar(etapa, clave, resultado, descripcion or {})
+        return resultado
+
+    def _guardar(self, etapa, clave, resultado, descripcion):
+        if isinstance(resultado, pd.Series):
+            tabla, tipo, nombre = resultado.to_frame('valor'), 'Series', resultado.name
+        elif isinstance(resultado, pd.DataFrame):
+            tabla, tipo, nombre = resultado, 'DataFrame', None
+        else:
+            return  # solo se guardan tablas
+
+        ruta_parquet, ruta_meta = self._rutas(etapa, clave)
+        os.makedirs(self.directorio, exist_ok=True)
+        tmp = ruta_parquet + '.tmp'
+        tabla.to_parquet(tmp)
+        os.replace(tmp, ruta_parquet)
+
+        meta = {
+            'etapa': etapa,
+            'clave': clave,
+            'tipo': tipo,
+            'nombre': nombre,
+            'bytes': os.path.getsize(ruta_parquet),
+            'creado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **descripcion,
+        }
+        tmp = ruta_meta + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp, ruta_meta)
+        self._liberar()
+
+    def entradas(self):
+        """Una fila por entrada guardada, de la usada más recientemente a la más antigua."""
+        filas = []
+        if os.path.isdir(self.directorio):
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith('.json'):
+                    continue
+                ruta_meta = os.path.join(self.directorio, nombre)
+                ruta_parquet = ruta_meta[:-len('.json')] + '.parquet'
+                try:
+                    with open(ruta_meta, encoding='utf-8') as f:
+                        meta = json.load(f)
+                    usado = os.path.getmtime(ruta_parquet)
+                except (OSError, ValueError):
+                    continue
+                filas.append({
+                    'etapa': meta['etapa'],
+                    'clave': meta['clave'][:16],
+                    'version': meta.get('version'),
+                    'parametros': meta.get('parametros'),
+                    'bytes': meta['bytes'],
+                    'creado': meta['creado'],
+                    'usado': datetime.fromtimestamp(usado, timezone.utc).isoformat(timespec='seconds'),
+                    '_ruta': ruta_parquet,
+                    '_usado': usado,
+                })
+        columnas = ['etapa', 'clave', 'version', 'parametros', 'bytes', 'creado', 'usado', '_ruta', '_usado']
+        return pd.DataFrame(filas, columns=columnas).sort_values('_usado', ascending=False, ignore_index=True)
+
+    def bytes_usados(self):
+        return int(self.entradas()['bytes'].sum())
+
+    def _borrar(self, ruta_parquet):
+        for ruta in (ruta_parquet, ruta_parquet[:-len('.parquet')] + '.json'):
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def _liberar(self):
+        """Borra las entradas usadas hace más tiempo hasta quedar dentro de ``max_bytes``."""
+        entradas = self.entradas()
+        total = entradas['bytes'].sum()
+        for ruta, tam in zip(entradas['_ruta'][::-1], entradas['bytes'][::-1]):
+            if total <= self.max_bytes:
+                break
+            self._borrar(ruta)
+            total -= tam
+
+    def purgar(self, etapa=None):
+        """Borra todas las entradas (o solo las de ``etapa``) y devuelve cuántas se borraron."""
+        entradas = self.entradas()
+        if etapa is not None:
+            entradas = entradas[entradas['etapa'] == etapa]
+        for ruta in entradas['_ruta']:
+            self._borrar(ruta)
+        return len(entradas)
+
+
+def etapa(version, depende=(), parametros=()):
+    """Convierte un método de un pipeline en una etapa memorizada y guardada en disco.
+
+    Funciona como ``cached_property``. Si el objeto tiene ``cache_etapas``
+    (un CacheEtapas), el resultado se busca primero en disco. ``depende`` son
+    los nombres de las etapas que usa; una etapa sin dependencias usa
+    ``self.huella_entrada``. ``parametros`` son atributos del objeto que
+    cambian el resultado. Subir ``version`` cuando cambie el cálculo.
+    """
+    def decorador(funcion):
+        nombre = funcion.__name__
+
+        def calcular(self):
+            cache = getattr(self, 'cache_etapas', None)
+            if cache is None:
+                return funcion(self)
+            descripcion = {
+                'version': version,
+                'parametros': {p: getattr(self, p) for p in parametros},
+            }
+            return cache.obtener(nombre, clave_etapa(self, nombre), lambda: funcion(self), descripcion)
+
+        calcular.__name__ = nombre
+        calcular.__doc__ = funcion.__doc__
+        calcular.etapa = {'version': version, 'depende': tuple(depende), 'parametros': tuple(parametros)}
+        return cached_property(calcular)
+
+    return decorador
+
+
+def clave_etapa(objeto, nombre):
+    """Clave de la etapa ``nombre`` de ``objeto``, incluyendo las de sus dependencias."""
+    claves = objeto.__dict__.setdefault('_claves_etapas', {})
+    if nombre not in claves:
+        definicion = getattr(type(objeto), nombre).func.etapa
+        partes = {
+            'etapa': nombre,
+            'version': definicion['version'],
+            'parametros': {p: getattr(objeto, p) for p in definicion['parametros']},
+        }
+        if definicion['depende']:
+            partes['depende'] = [clave_etapa(objeto, d) for d in definicion['depende']]
+        else:
+            partes['entrada'] = objeto.huella_entrada
+        texto = json.dumps(partes, sort_keys=True, default=str)
+        claves[nombre] = hashlib.sha1(texto.encode('utf-8')).hexdigest()
+    return claves[nombre]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Revisa o vacía la caché de etapas del análisis de cobertura.')
+    parser.add_argument('accion', choices=['info', 'purgar'])
+    parser.add_argument('--etapa', help='solo las entradas de esta etapa (para purgar)')
+    parser.add_argument('--dir', default=DIR_CACHE_ETAPAS)
+    args = parser.parse_args()
+
+    cache = CacheEtapas(args.dir)
+    if args.accion == 'purgar':
+        print(f"Se borraron {cache.purgar(args.etapa)} entradas de {args.dir}")
+    else:
+        entradas = cache.entradas()
+        with pd.option_context('display.width', 200, 'display.max_colwidth', 40):
+            print(entradas.drop(columns=['_ruta', '_usado']).to_string(index=False))
+        print(f"{len(entradas)} entradas, {entradas['bytes'].sum() / 1e6:.1f} MB de {cache.max_bytes / 1e6:.0f} MB")
@@ -0,0 +1,87 @@
+"""
+Caché de figuras Plotly para los dashboards de Streamlit.
+
+Cada figura se guarda tal cual (el objeto ``go.Figure``) bajo la llave
+(id del gráfico, estado de los filtros, versión de los datos), así un acierto
+no vuelve a construirla ni a validarla: ``st.plotly_chart`` acepta el objeto
+directamente. El tamaño de cada figura se mide una vez, al guardarla, por la
+longitud de su JSON. Las entradas menos usadas se descartan cuando el total
+supera el límite de memoria.
+"""
+
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+
+class CacheFiguras:
+    """Caché LRU de figuras Plotly, limitada por tamaño en bytes.
+
+    Es segura para usarse desde varias sesiones a la vez (un solo objeto por
+    proceso, p. ej. con ``st.cache_resource``). Las sesiones comparten la
+    misma figura, así que no se debe modificar la que se recibe.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._figuras = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figuras)
+
+    @property
+    def bytes_usados(self):
+        return self._bytes
+
+    def obtener(self, id_grafico, estado, version, construir):
+        """Devuelve la figura de la caché o la construye con ``construir()``.
+
+        ``estado`` y ``version`` deben ser valores hashables (texto, números o
+        tuplas); cualquier cambio en ellos genera una figura nueva. La figura
+        devuelta es la misma que queda en la caché: no se debe modificar.
+        """
+        llave = (id_grafico, estado, version)
+        with self._lock:
+            entrada = self._figuras.get(llave)
+            if entrada is not None:
+                self._figuras.move_to_end(llave)
+                self.aciertos += 1
+
+        if entrada is None:
+            figura = construir()
+            self._guardar(llave, figura)
+            with self._lock:
+                self.fallos += 1
+            return figura
+
+        return entrada[0]
+
+    def _guardar(self, llave, figura):
+        # El tamaño se estima una sola vez por la longitud del JSON (sin validar de nuevo)
+        tamanio = len(pio.to_json(figura, validate=False).encode('utf-8'))
+        if tamanio > self.max_bytes:
+            # Una figura más grande que todo el límite no se guarda
+            return
+
+        with self._lock:
+            anterior = self._figuras.pop(llave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+
+            self._figuras[llave] = (figura, tamanio)
+            self._bytes += tamanio
+
+            # Descartar las figuras usadas hace más tiempo
+            while self._bytes > self.max_bytes:
+                _, (_, tamanio_descartada) = self._figuras.popitem(last=False)
+                self._bytes -= tamanio_descartada
+
+    def limpiar(self):
+        with self._lock:
+            self._figuras.clear()
+            self._bytes = 0
@@ -0,0 +1,77 @@
+"""
+Lectura del conjunto de Cobertura Móvil compartida por code.py, modelo.py y
+app_proyecto.py.
+
+El esquema se declara una sola vez: las áreas se leen como números con coma
+decimal, los años, trimestres y códigos DIVIPOLA como enteros pequeños y los
+nombres como categóricas, que ocupan mucho menos que columnas de texto.
+
+Además se agrega PERIODO_ID (año * 10 + trimestre) y las filas quedan
+ordenadas por esa clave, de modo que filtrar un periodo es una búsqueda
+binaria seguida de un corte, sin comparar fila por fila.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Archivo publicado por trimestre
+RUTA_COBERTURA = './data/Datos_Cobertura Movil_1T_2023 a 4T_2024.csv'
+
+# Áreas cubiertas por operador
+COLS_AREA = ['AREA_COB_CLARO', 'AREA_COB_MOVISTAR', 'AREA_COB_TIGO', 'AREA_COB_WOM']
+
+# Columnas con coma decimal
+COLS_DECIMALES = ['AREA_CPOB'] + COLS_AREA
+
+ESQUEMA_COBERTURA = {
+    'ANNO': 'int16',
+    'TRIMESTRE': 'int16',
+    'ID_DEPARTAMENTO': 'int16',
+    'DEPARTAMENTO': 'category',
+    'ID_MUNICIPIO': 'int32',
+    'MUNICIPIO': 'category',
+    'ID_CPOB': 'int32',
+    'CPOB': 'category',
+    'ID_TECNOLOGIA': 'int16',
+    'TECNOLOGIA': 'category',
+    'NIVEL_SENAL': 'int16',
+    **{col: 'float64' for col in COLS_DECIMALES},
+}
+
+
+def clave_periodo(anno, trimestre):
+    """Clave entera de un periodo: 2024, 4 -> 20244."""
+    return anno * 10 + trimestre
+
+
+def cargar_cobertura(ruta=RUTA_COBERTURA, float32=False):
+    """Lee el CSV de cobertura móvil con ESQUEMA_COBERTURA.
+
+    Agrega PERIODO_ID y deja las filas ordenadas por periodo (el orden dentro
+    de cada periodo se conserva). Con ``float32=True`` las áreas se guardan en
+    precisión simple, que ocupa la mitad de memoria a cambio de unos 7 dígitos
+    significativos.
+    """
+    esquema = dict(ESQUEMA_COBERTURA)
+    if float32:
+        esquema.update({col: 'float32' for col in COLS_DECIMALES})
+
+    df = pd.read_csv(ruta, sep=';', decimal=',', dtype=esquema)
+    df['PERIODO_ID'] = clave_periodo(df['ANNO'].astype('int32'), df['TRIMESTRE'])
+
+    # El archivo normalmente ya viene ordenado por periodo; solo se ordena si no
+    if not df['PERIODO_ID'].is_monotonic_increasing:
+        df = df.sort_values('PERIODO_ID', kind='stable')
+    return df
+
+
+def filtrar_periodo(df, anno, trimestre):
+    """Filas de un periodo, como un corte de ``df``.
+
+    ``df`` debe estar ordenado por PERIODO_ID, como lo entrega cargar_cobertura.
+    """
+    clave = clave_periodo(anno, trimestre)
+    periodos = df['PERIODO_ID'].to_numpy()
+    inicio = np.searchsorted(periodos, clave, side='left')
+    fin = np.searchsorted(periodos, clave, side='right')
+    return df.iloc[inicio:fin]
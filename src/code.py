@@ -20,393 +20,383 @@ AREA_COB_WOM         | Flotante     | Área en km² cubierta por WOM.
 ---------------------|--------------|-----------------------------------------------------------------------------------------------------------------------------
 """
 
-import pandas as pd
-import json 
-from urllib.request import urlopen
-
-# leer base de datos
-df = pd.read_csv('./data/Datos_Cobertura Movil_1T_2023 a 4T_2024.csv', sep=';')
-df.info()
-
-# Dimensiones del df
-print(df.shape)
+# Las tablas del análisis se calculan bajo demanda: importar este módulo no lee
+# el CSV ni usa la red. ``from .code import df_comparativo`` calcula solo
+# df_comparativo y las tablas de las que depende (ver ``__getattr__`` al final).
+# Las tablas históricas (df_base, df_temp, df_long, df_cob_max_cpob_4g y
+# df_cuenta_sin_tecnologia) salen del historial por trimestre (historial.py)
+# cuando tiene trimestres registrados; si no, del CSV completo.
+# Para ver la exploración inicial (info, dimensiones y, comparando códigos
+# DIVIPOLA, los departamentos sin polígono en el GeoJSON y los polígonos sin datos):
+#   python -m src.code
+
+from functools import cached_property
 
-# Revisar si hay valores nulos
-df.isnull().values.any()
-print(df.shape)
-
-# Revisar los tipos de datos
-print(df.dtypes)
-
-# Convertir el tipo de dato de cada variable
-cols = ['AREA_COB_CLARO', 'AREA_COB_MOVISTAR', 'AREA_COB_TIGO', 'AREA_COB_WOM','AREA_CPOB']
+import pandas as pd
 
-df[cols] = (
-    df[cols]
-    .apply(lambda x: x.str.replace(',', '.', regex=False))  # Reemplaza coma por punto
-    .astype(float)  # Convertir a número decimal
+from .agregados import (
+    CLAVES_BASE, agregado_base, agregar_desde_base, cuenta_sin_cobertura, formato_largo,
+    maximos_cpob, moda_por_grupo, operador_max, porcentajes_4g, promedios_depto_periodo, serie_tecnologias,
+    top_k_por_grupo
 )
-
-# Convertir el tipo de dato de cada variable
-df['ANNO'] = df['ANNO'].astype(str)
-df['TRIMESTRE'] = df['TRIMESTRE'].astype(str)
-df['ID_DEPARTAMENTO'] = df['ID_DEPARTAMENTO'].astype(str)
-df['DEPARTAMENTO'] = df['DEPARTAMENTO'].astype(str)
-df['ID_MUNICIPIO'] = df['ID_MUNICIPIO'].astype(str)
-df['MUNICIPIO'] = df['MUNICIPIO'].astype(str)
-df['CPOB'] = df['CPOB'].astype(str)
-df['ID_TECNOLOGIA'] = df['ID_TECNOLOGIA'].astype(str)
-
-print(df.dtypes)
-
-# Resumen estadístico
-df.describe()
-
-# Contar el número de departamentos únicos
-num_departamentos = df['DEPARTAMENTO'].nunique()
-print(f"Departamentos: {num_departamentos}")
-
-# Contar el número de municipios únicos
-num_municipios = df['MUNICIPIO'].nunique()
-print(f"Municipios: {num_municipios}")
-
-# Contar el número de CPOB únicos
-num_cpob = df['CPOB'].nunique()
-print(f"CPOB: {num_cpob}")
+from .cache_etapas import DIR_CACHE_ETAPAS, CacheEtapas, etapa, huella_archivo
+from .carga import COLS_AREA, RUTA_COBERTURA, cargar_cobertura, filtrar_periodo
+from .geometria import URL_GEOJSON, cargar_geojson
+from .historial import HistorialCobertura
+from .resumenes import conteo_grupos, resumen_cajas
 
 cols = ['AREA_COB_CLARO', 'AREA_COB_MOVISTAR', 'AREA_COB_TIGO', 'AREA_COB_WOM']
 
-#---------------------------------------------
-
-# Filtrar datos para el año 2024 y trimestre 4
-
-df_actual = df[(df['ANNO'] == '2024') & (df['TRIMESTRE'] == '4')]
-
-
-# Agrupar por DEPARTAMENTO, MUNICIPIO, CPOB y TECNOLOGIA y sumar las áreas de cobertura
-df_actual = (
-    df_actual.groupby(['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB','TECNOLOGIA'], as_index=False)
-    .agg({
-        'AREA_CPOB': 'first',  # el área total urbana es la misma
-        'AREA_COB_CLARO': 'sum',
-        'AREA_COB_MOVISTAR': 'sum',
-        'AREA_COB_TIGO': 'sum',
-        'AREA_COB_WOM': 'sum'
+# Periodo que se analiza en detalle
+ANNO_ACTUAL = 2024
+TRIMESTRE_ACTUAL = 4
+
+# Nivel de detalle del GeoJSON para los mapas de todo el país (ver geometria.NIVELES)
+NIVEL_MAPA = 'medio'
+
+
+class PipelineCobertura:
+    """Tablas del análisis de cobertura móvil, calculadas bajo demanda y memorizadas.
+
+    Cada atributo se calcula la primera vez que se consulta, junto con los que
+    necesita (indicados en ``depende``), y luego se reutiliza. Las tablas se
+    comparten entre quienes las piden: no deben modificarse.
+
+    Las etapas también se guardan en disco (ver cache_etapas.py), de modo que
+    otra ejecución con el mismo archivo las lee en lugar de recalcularlas. Con
+    ``dir_cache=None`` no se usa el disco.
+
+    Con ``historial`` (un HistorialCobertura) df_base, df_temp,
+    df_cob_max_cpob_4g y df_cuenta_sin_tecnologia se arman con los trimestres
+    registrados en él, sin leer el CSV; las demás tablas históricas salen de
+    ellas. El historial debe incluir los trimestres del CSV (``python -m
+    src.historial registrar <csv>``).
+    """
+
+    def __init__(self, ruta=RUTA_COBERTURA, anno=ANNO_ACTUAL, trimestre=TRIMESTRE_ACTUAL, url_geojson=URL_GEOJSON,
+                 nivel_mapa=NIVEL_MAPA, dir_cache=DIR_CACHE_ETAPAS, historial=None):
+        self.ruta = ruta
+        self.anno = anno
+        self.trimestre = trimestre
+        self.url_geojson = url_geojson
+        self.nivel_mapa = nivel_mapa
+        self.cache_etapas = CacheEtapas(dir_cache) if dir_cache else None
+        self.historial = historial
+
+    @cached_property
+    def huella_entrada(self):
+        # Huella del CSV: si el archivo cambia, todas las etapas se recalculan
+        return huella_archivo(self.ruta)
+
+    @cached_property
+    def huella_historial(self):
+        # Parámetro de las etapas que salen del historial: cambia al registrar un trimestre
+        return self.historial.huella if self.historial is not None else None
+
+    @etapa(1)
+    def df(self):
+        # leer base de datos (los tipos de cada variable se definen en ESQUEMA_COBERTURA)
+        return cargar_cobertura(self.ruta)
+
+    @cached_property
+    def num_departamentos(self):
+        # Contar el número de departamentos únicos
+        return self.df['DEPARTAMENTO'].nunique()
+
+    @cached_property
+    def num_municipios(self):
+        # Contar el número de municipios únicos
+        return self.df['MUNICIPIO'].nunique()
+
+    @cached_property
+    def num_cpob(self):
+        # Contar el número de CPOB únicos
+        return self.df['CPOB'].nunique()
+
+    @etapa(1, depende=('df',), parametros=('huella_historial',))
+    def df_base(self):
+        # Agregado base por ANNO, TRIMESTRE, DEPARTAMENTO, MUNICIPIO, CPOB y TECNOLOGIA:
+        # única agrupación sobre todas las filas, las demás tablas se calculan desde aquí
+        if self.historial is not None:
+            return self.historial.base   # unión de los agregados de cada trimestre
+        return agregado_base(self.df)
+
+    @etapa(1, depende=('df',), parametros=('anno', 'trimestre'))
+    def df_filtrado(self):
+        # Filtrar datos para el periodo analizado (corte por PERIODO_ID, sin comparar fila por fila)
+        return filtrar_periodo(self.df, self.anno, self.trimestre)
+
+    @etapa(1, depende=('df_base',), parametros=('anno', 'trimestre'))
+    def df_actual(self):
+        # Áreas de cobertura del periodo por DEPARTAMENTO, MUNICIPIO, CPOB y TECNOLOGIA
+        # (el área total urbana es la misma, se toma la primera)
+        df_actual = (
+            filtrar_periodo(self.df_base, self.anno, self.trimestre)[CLAVES_BASE + ['AREA_CPOB'] + COLS_AREA]
+            .reset_index(drop=True)
+        )
+
+        # Área de cobertura máxima entre los operadores para cada fila y de qué operador es
+        # (argmax sobre las cuatro columnas; en empates gana el primer operador)
+        df_actual["OPERADOR_MAX"], df_actual["AREA_COB_MAX"] = operador_max(df_actual)
+        return df_actual[CLAVES_BASE + ['AREA_CPOB'] + COLS_AREA + ['AREA_COB_MAX', 'OPERADOR_MAX']]
+
+    @etapa(1, depende=('df_actual',))
+    def df_max_tecnologia(self):
+        # Calcular el máximo y la tecnología correspondiente por cada CPOB
+        df_max_tecnologia = top_k_por_grupo(
+            self.df_actual, ['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB'], 'AREA_COB_MAX'
+        ).copy()
+        # Renombrar la columna para mayor claridad
+        df_max_tecnologia.rename(columns={'AREA_COB_MAX': 'AREA_COB_MAX_TECNOLOGIAS'}, inplace=True)
+
+        # Crear una columna que identifique la tecnología del máximo
+        df_max_tecnologia['TECNOLOGIA_MAX'] = df_max_tecnologia['TECNOLOGIA']
+
+        # Calcular el porcentaje de cobertura del operador con mayor área de cobertura en comparación con el área total del CPOB
+        df_max_tecnologia['PORCENTAJE_COBERTURA'] = (df_max_tecnologia['AREA_COB_MAX_TECNOLOGIAS'] / df_max_tecnologia['AREA_CPOB']) * 100
+        return df_max_tecnologia.sort_values(by='PORCENTAJE_COBERTURA',ascending=True)
+
+    @etapa(1, depende=('df_max_tecnologia',))
+    def df_departamento(self):
+        # Agrupar por departamento
+        df_departamento = self.df_max_tecnologia.groupby('DEPARTAMENTO', as_index=False, observed=True).agg({
+            'PORCENTAJE_COBERTURA': 'mean'
         })
-)
-
-
-
-# Calcular el área de cobertura máxima entre los operadores para cada fila
-df_actual["AREA_COB_MAX"] = df_actual[["AREA_COB_CLARO", "AREA_COB_MOVISTAR", "AREA_COB_TIGO", "AREA_COB_WOM"]].max(axis=1)
-
-# Identificar de qué operador es ese máximo
-df_actual["OPERADOR_MAX"] = (
-    df_actual[["AREA_COB_CLARO", "AREA_COB_MOVISTAR", "AREA_COB_TIGO", "AREA_COB_WOM"]]
-    .idxmax(axis=1)                       # obtiene el nombre de la columna con el valor máximo
-    .str.replace("AREA_COB_", "")          # quita el prefijo
-    .str.upper()                           # pone todo en mayúsculas (por estética)
-)
-
-# Calcular el máximo y la tecnología correspondiente por cada CPOB
-df_max_tecnologia = (
-    df_actual.loc[df_actual.groupby(['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB'])['AREA_COB_MAX'].idxmax()]
-    .copy()
-)
-# Renombrar la columna para mayor claridad
-df_max_tecnologia.rename(columns={'AREA_COB_MAX': 'AREA_COB_MAX_TECNOLOGIAS'}, inplace=True)
-
-# Crear una columna que identifique la tecnología del máximo
-df_max_tecnologia['TECNOLOGIA_MAX'] = df_max_tecnologia['TECNOLOGIA']
-print(df_max_tecnologia.dtypes)
-
-
-# Calcular el porcentaje de cobertura del operador con mayor área de cobertura en comparación con el área total del CPOB
-df_max_tecnologia['PORCENTAJE_COBERTURA'] = (df_max_tecnologia['AREA_COB_MAX_TECNOLOGIAS'] / df_max_tecnologia['AREA_CPOB']) * 100
-df_max_tecnologia = df_max_tecnologia.sort_values(by='PORCENTAJE_COBERTURA',ascending=True)
-
-
-# Agrupar por departamento
-df_departamento = df_max_tecnologia.groupby('DEPARTAMENTO', as_index=False).agg({
-    'PORCENTAJE_COBERTURA': 'mean',
-    'OPERADOR_MAX': lambda x: x.value_counts().idxmax()
-})
-
-# Top 10 con menor y mayor cobertura
-top10_menor = df_departamento.sort_values(by='PORCENTAJE_COBERTURA', ascending=True).head(6)
-top10_mayor = df_departamento.sort_values(by='PORCENTAJE_COBERTURA', ascending=False).head(6)
-
-# Añadir signo negativo a los de menor cobertura (para el espejo)
-top10_menor['PORCENTAJE_COBERTURA'] = -top10_menor['PORCENTAJE_COBERTURA']
-
-# Unir ambos en un solo DataFrame
-df_comparativo = pd.concat([top10_menor, top10_mayor])
-
-# Contar número de CPOB por operador predominante
-conteo_operador = df_max_tecnologia['OPERADOR_MAX'].value_counts()
-
-# Calcular porcentaje
-porcentaje_operador = (conteo_operador / conteo_operador.sum()) * 100
-
-
-# Sumar área ganadora por operador en cada municipio
-df_municipio = (
-    df_max_tecnologia
-    .groupby(['DEPARTAMENTO', 'MUNICIPIO', 'OPERADOR_MAX'], as_index=False)
-    .agg({'AREA_COB_MAX_TECNOLOGIAS': 'sum'})
-)
-
-# Para cada municipio seleccionar el operador que mayor área suma
-df_municipio_predominante = (
-    df_municipio.loc[
-        df_municipio.groupby(['DEPARTAMENTO', 'MUNICIPIO'])['AREA_COB_MAX_TECNOLOGIAS'].idxmax()
-    ][['DEPARTAMENTO', 'MUNICIPIO', 'OPERADOR_MAX']]
-)
-
-# Filtrar por año 2024 y trimestre 4
-df_filtrado = df[(df['ANNO'] == '2024') & (df['TRIMESTRE'] == '4')]
-
-# Seleccionar los top departamentos por cantidad de registros
-top_deptos = df_filtrado['DEPARTAMENTO'].value_counts().head(30).index
-df_top = df_filtrado[df_filtrado['DEPARTAMENTO'].isin(top_deptos)]
-
-# df lugares sin cobertura, para sacar deptos con mayor número de poblados sin cobertura
-df_sin_tecnologia = df[(df['TECNOLOGIA'] == 'Ninguna')]
-
-# Contar cuántos poblados únicos hay sin tecnología (cobertura) en c/departamento
-df_cuenta_sin_tecnologia = (
-    df_sin_tecnologia
-    .groupby(['ANNO', 'DEPARTAMENTO'])['CPOB']
-    .nunique()  # cuenta poblados únicos
-    .reset_index(name='NUM_CPOB_SIN_TEC')
-)
-
-# Orden ascendente
-df_cuenta_sin_tecnologia = df_cuenta_sin_tecnologia.sort_values(['ANNO', 'NUM_CPOB_SIN_TEC'], ascending=[True, False])
-
-
-# Calcular la matriz de correlación entre las áreas de cobertura de los diferentes operadores
-cols_num = [
-    'AREA_CPOB',
-    'AREA_COB_CLARO',
-    'AREA_COB_MOVISTAR',
-    'AREA_COB_TIGO',
-    'AREA_COB_WOM'
-]
-
-# Calcular matriz de correlación
-corr_matrix = df[cols_num].corr()
-
-# Agrupación: año, trimestre y tecnología
-df_temp = (
-    df.groupby(["ANNO","TRIMESTRE","TECNOLOGIA"], as_index=False)
-      .agg({
-          "AREA_COB_CLARO": "sum",
-          "AREA_COB_MOVISTAR": "sum",
-          "AREA_COB_TIGO": "sum",
-          "AREA_COB_WOM": "sum"
-      })
-)
-
-# Crear columna de tiempo ordenable
-df_temp["PERIODO"] = df_temp["ANNO"].astype(str) + "-T" + df_temp["TRIMESTRE"].astype(str)
-
-# Reorganizar a formato largo para que Plotly pueda graficarlo
-df_long = df_temp.melt(
-    id_vars=["PERIODO", "ANNO", "TRIMESTRE", "TECNOLOGIA"],
-    value_vars=["AREA_COB_CLARO", "AREA_COB_MOVISTAR", "AREA_COB_TIGO", "AREA_COB_WOM"],
-    var_name="OPERADOR",
-    value_name="AREA_COBERTURA"
-)
-
-# Limpiar nombres de operador para mejor visualización
-df_long["OPERADOR"] = df_long["OPERADOR"].str.replace("AREA_COB_", "", regex=False)
-
-#---------------- MAPAS COROPLETICOS DE COLOMBIA
-
-# Supongamos que tu DataFrame se llama df
-df_resumen = (
-    df.groupby(['ANNO','TRIMESTRE','DEPARTAMENTO','CPOB', 'TECNOLOGIA'], as_index=False)
-    .agg({
-        'AREA_CPOB': 'first',  # el área total urbana es la misma
-        'AREA_COB_CLARO': 'sum',
-        'AREA_COB_MOVISTAR': 'sum',
-        'AREA_COB_TIGO': 'sum',
-        'AREA_COB_WOM': 'sum'
+        # Operador predominante (el que gana en más CPOB; en empates, el que aparece primero)
+        df_departamento['OPERADOR_MAX'] = moda_por_grupo(self.df_max_tecnologia, ['DEPARTAMENTO'], 'OPERADOR_MAX')['OPERADOR_MAX']
+        return df_departamento
+
+    @etapa(1, depende=('df_departamento',))
+    def top10_menor(self):
+        # Departamentos con menor cobertura, con signo negativo (para el espejo)
+        top10_menor = self.df_departamento.sort_values(by='PORCENTAJE_COBERTURA', ascending=True).head(6)
+        top10_menor['PORCENTAJE_COBERTURA'] = -top10_menor['PORCENTAJE_COBERTURA']
+        return top10_menor
+
+    @etapa(1, depende=('df_departamento',))
+    def top10_mayor(self):
+        # Departamentos con mayor cobertura
+        return self.df_departamento.sort_values(by='PORCENTAJE_COBERTURA', ascending=False).head(6)
+
+    @etapa(1, depende=('top10_menor', 'top10_mayor'))
+    def df_comparativo(self):
+        # Unir ambos en un solo DataFrame
+        return pd.concat([self.top10_menor, self.top10_mayor])
+
+    @etapa(1, depende=('df_max_tecnologia',))
+    def conteo_operador(self):
+        # Contar número de CPOB por operador predominante
+        conteo_operador = self.df_max_tecnologia['OPERADOR_MAX'].value_counts()
+        return conteo_operador[conteo_operador > 0]   # sin los operadores que no ganan en ningún CPOB
+
+    @etapa(1, depende=('conteo_operador',))
+    def porcentaje_operador(self):
+        # Calcular porcentaje
+        return (self.conteo_operador / self.conteo_operador.sum()) * 100
+
+    @etapa(1, depende=('df_max_tecnologia',))
+    def df_municipio(self):
+        # Sumar área ganadora por operador en cada municipio
+        return (
+            self.df_max_tecnologia
+            .groupby(['DEPARTAMENTO', 'MUNICIPIO', 'OPERADOR_MAX'], as_index=False, observed=True)
+            .agg({'AREA_COB_MAX_TECNOLOGIAS': 'sum'})
+        )
+
+    @etapa(1, depende=('df_municipio',))
+    def df_municipio_predominante(self):
+        # Para cada municipio seleccionar el operador que mayor área suma
+        return top_k_por_grupo(
+            self.df_municipio, ['DEPARTAMENTO', 'MUNICIPIO'], 'AREA_COB_MAX_TECNOLOGIAS'
+        )[['DEPARTAMENTO', 'MUNICIPIO', 'OPERADOR_MAX']]
+
+    @etapa(1, depende=('df_filtrado',))
+    def df_top(self):
+        # Seleccionar los top departamentos por cantidad de registros
+        top_deptos = self.df_filtrado['DEPARTAMENTO'].value_counts().head(30).index
+        return self.df_filtrado[self.df_filtrado['DEPARTAMENTO'].isin(top_deptos)]
+
+    @etapa(1, depende=('df_top',))
+    def conteo_top(self):
+        # Registros por departamento y tecnología en los top departamentos (GRAFICO 1)
+        return conteo_grupos(self.df_top, 'DEPARTAMENTO', 'TECNOLOGIA')
+
+    @etapa(1, depende=('df',))
+    def resumen_areas(self):
+        # Cuartiles, bigotes y una muestra de atípicos del área cubierta por operador (GRAFICO 2)
+        return resumen_cajas(self.df, cols)
+
+    @etapa(1, depende=('df',))
+    def df_sin_tecnologia(self):
+        # df lugares sin cobertura, para sacar deptos con mayor número de poblados sin cobertura
+        return self.df[(self.df['TECNOLOGIA'] == 'Ninguna')]
+
+    @etapa(1, depende=('df_sin_tecnologia',), parametros=('huella_historial',))
+    def df_cuenta_sin_tecnologia(self):
+        # Contar cuántos poblados únicos hay sin tecnología (cobertura) en c/departamento,
+        # ordenados por año y de mayor a menor número de poblados
+        if self.historial is not None:
+            return self.historial.df_cuenta_sin_tecnologia   # acumulado por año
+        return cuenta_sin_cobertura(self.df_sin_tecnologia)
+
+    @etapa(1, depende=('df',))
+    def corr_matrix(self):
+        # Calcular la matriz de correlación entre las áreas de cobertura de los diferentes operadores
+        cols_num = [
+            'AREA_CPOB',
+            'AREA_COB_CLARO',
+            'AREA_COB_MOVISTAR',
+            'AREA_COB_TIGO',
+            'AREA_COB_WOM'
+        ]
+        return self.df[cols_num].corr()
+
+    @etapa(1, depende=('df_base',))
+    def df_temp(self):
+        # Agrupación: año, trimestre y tecnología, con columna de tiempo ordenable
+        if self.historial is not None:
+            return self.historial.df_temp   # sin armar df_base completo
+        return serie_tecnologias(self.df_base)
+
+    @etapa(1, depende=('df_temp',))
+    def df_long(self):
+        # Reorganizar a formato largo para que Plotly pueda graficarlo (nombres de operador sin prefijo)
+        return formato_largo(self.df_temp)
+
+    #---------------- MAPAS COROPLETICOS DE COLOMBIA
+
+    @etapa(1, depende=('df_base',))
+    def df_resumen(self):
+        # Agrupación sin municipio
+        return agregar_desde_base(self.df_base, ['ANNO','TRIMESTRE','DEPARTAMENTO','CPOB', 'TECNOLOGIA'])
+
+    @etapa(1, depende=('df_resumen',))
+    def df_4g(self):
+        # % del área de cada CPOB cubierta por operador en 4G (los mayores a 100 se ajustan a 100)
+        return porcentajes_4g(self.df_resumen)
+
+    @cached_property
+    def counties(self):
+        # GeoJSON de Colombia (copia local; solo la primera vez se descarga).
+        # Cada polígono trae id = código DIVIPOLA del departamento (ID_DEPARTAMENTO)
+        return cargar_geojson(self.nivel_mapa, self.url_geojson)
+
+    @etapa(1, depende=('df',))
+    def codigos_departamento(self):
+        # Código DIVIPOLA de cada departamento, para unir las tablas con el GeoJSON
+        return (
+            self.df.groupby('DEPARTAMENTO', as_index=False, observed=True)['ID_DEPARTAMENTO']
+            .first()
+        )
+
+    @etapa(1, depende=('df_4g',))
+    def df_cob_max_cpob_4g(self):
+        # df cobertura máxima por poblado/cabecera municipal
+        # (valor máximo de cada operador para ese CPOB a través del tiempo)
+        if self.historial is not None:
+            return self.historial.df_cob_max_cpob_4g   # acumulado trimestre a trimestre
+        return maximos_cpob(self.df_4g)
+
+    @etapa(2, depende=('df_cob_max_cpob_4g', 'codigos_departamento'))
+    def df_cob_max_depto_4g(self):
+        # Promedio departamental de los PCT_COB máximos reportados, con el código
+        # DIVIPOLA del departamento (ID_DEPARTAMENTO) para ubicarlo en el mapa
+        df_cob_max_depto_4g = (
+            self.df_cob_max_cpob_4g.groupby('DEPARTAMENTO', observed=True)[['PCT_CLARO', 'PCT_MOVISTAR', 'PCT_TIGO', 'PCT_WOM']]
+            .mean()
+            .reset_index()
+        )
+        df_cob_max_depto_4g = self.codigos_departamento.merge(df_cob_max_depto_4g, on='DEPARTAMENTO')
+        df_cob_max_depto_4g = df_cob_max_depto_4g[['ID_DEPARTAMENTO'] + list(df_cob_max_depto_4g.columns.drop('ID_DEPARTAMENTO'))]
+
+        # Renombrar columnas para reflejar el cálculo de 'Máximo Promedio'
+        return df_cob_max_depto_4g.rename(columns={
+            'PCT_CLARO': 'PCT_MAX_PROMEDIO_CLARO',
+            'PCT_MOVISTAR': 'PCT_MAX_PROMEDIO_MOVISTAR',
+            'PCT_TIGO': 'PCT_MAX_PROMEDIO_TIGO',
+            'PCT_WOM': 'PCT_MAX_PROMEDIO_WOM'
         })
-)
-
-df_4g = df_resumen[df_resumen['TECNOLOGIA'] == '4G'].copy()
-
-#df_resumen['PCT_CLARO'].shape
-df_4g['PCT_CLARO'] = (df_4g['AREA_COB_CLARO'] / df_4g['AREA_CPOB']) * 100
-df_4g['PCT_MOVISTAR'] = (df_4g['AREA_COB_MOVISTAR'] / df_4g['AREA_CPOB']) * 100
-df_4g['PCT_TIGO'] = (df_4g['AREA_COB_TIGO'] / df_4g['AREA_CPOB']) * 100
-df_4g['PCT_WOM'] = (df_4g['AREA_COB_WOM'] / df_4g['AREA_CPOB']) * 100
-
-# revisar % cobertura mayor a 100
-(df_4g[['PCT_CLARO','PCT_MOVISTAR','PCT_TIGO','PCT_WOM']] > 100).any()
-df_4g[df_4g[['PCT_CLARO','PCT_MOVISTAR','PCT_TIGO','PCT_WOM']].gt(100).any(axis=1)]
-
-# Ajustar % cobertura mayores a 100 = 100
-df_4g[['PCT_CLARO','PCT_MOVISTAR','PCT_TIGO','PCT_WOM']] = (
-    df_4g[['PCT_CLARO','PCT_MOVISTAR','PCT_TIGO','PCT_WOM']].clip(upper=100)
-)
-
-
-
-# URL del archivo GeoJSON de Colombia
-url_geojson = 'https://gist.githubusercontent.com/john-guerra/43c7656821069d00dcbc/raw/be6a6e239cd5b5b803c6e7c2ec405b793a9064dd/Colombia.geo.json'
-
-try:
-    with urlopen(url_geojson) as response:
-        # La variable 'counties' contiene las coordenadas de los polígonos
-        counties = json.load(response)
-
-    print(f"GeoJSON cargado exitosamente. Contiene {len(counties['features'])} entidades geográficas.")
-    print("El archivo GeoJSON está listo para usarse en la visualización.")
-
-except Exception as e:
-    print(f"Ocurrió un error al cargar el GeoJSON: {e}")
-
-
-# Extraer los nombres de los departamentos del GeoJSON
-
-# Inicializar set para almacenar nombres
-nombres_departamentos = set()
-
-# Recorrer lista de 'features' (características, así está el nombre de los datos geográficos en el GeoJson)
-for feature in counties['features']:
-    # Acceder a las propiedades de cada entidad y luego al nombre del departamento / La clave es 'NOMBRE_DPT'
-    nombre = feature['properties']['NOMBRE_DPT']
-    nombres_departamentos.add(nombre)
-
-# Convertir el set a una lista y ordenarla alfabéticamente para imprimir
-lista_departamentos = sorted(list(nombres_departamentos))
-departamentos_df_4g = sorted(df_4g['DEPARTAMENTO'].unique())
-
-print(f"Total de departamentos encontrados en el GeoJSON: {len(lista_departamentos)}")
-print("-" * 30)
-
-# Comparar nombres de departamentos en geojson y dataframe de cobertura móvil
-for dpto_mapa, dpto_df in zip(lista_departamentos, departamentos_df_4g):
-    print(f''' {dpto_mapa}' : '{dpto_df}' ''')
-
-
-# Estandarización de nombres de departamentos en el GeoJSON
-
-mapeo_nombres = {
-    'ARCHIPIELAGO DE SAN ANDRES PROVIDENCIA Y SANTA CATALINA': 'SAN ANDRES',
-    'SANTAFE DE BOGOTA D.C': 'BOGOTÁ. D.C.',
-    'AMAZONAS': 'AMAZONAS',
-    'ANTIOQUIA': 'ANTIOQUIA',
-    'ARAUCA': 'ARAUCA',
-    'ATLANTICO': 'ATLÁNTICO',
-    'BOLIVAR': 'BOLÍVAR',
-    'BOYACA': 'BOYACÁ',
-    'CALDAS': 'CALDAS',
-    'CAQUETA': 'CAQUETÁ',
-    'CASANARE': 'CASANARE',
-    'CAUCA': 'CAUCA',
-    'CESAR': 'CESAR',
-    'CHOCO': 'CHOCÓ',
-    'CORDOBA': 'CÓRDOBA',
-    'CUNDINAMARCA': 'CUNDINAMARCA',
-    'GUAINIA': 'GUAINÍA',
-    'GUAVIARE': 'GUAVIARE',
-    'HUILA': 'HUILA',
-    'LA GUAJIRA': 'LA GUAJIRA',
-    'MAGDALENA': 'MAGDALENA',
-    'META': 'META',
-    'NARIÑO': 'NARIÑO',
-    'NORTE DE SANTANDER': 'NORTE DE SANTANDER',
-    'PUTUMAYO': 'PUTUMAYO',
-    'QUINDIO': 'QUINDÍO',
-    'RISARALDA': 'RISARALDA',
-    'SANTANDER': 'SANTANDER',
-    'SUCRE': 'SUCRE',
-    'TOLIMA': 'TOLIMA',
-    'VALLE DEL CAUCA': 'VALLE DEL CAUCA',
-    'VAUPES': 'VAUPÉS',
-    'VICHADA': 'VICHADA'
-}
-
-# Recorrer el GeoJSON y aplicar el cambio
-contador_cambios = 0
-for feature in counties['features']:
-    nombre_geojson = feature['properties']['NOMBRE_DPT']
-
-    if nombre_geojson in mapeo_nombres:
-        feature['properties']['NOMBRE_DPT'] = mapeo_nombres[nombre_geojson]
-        contador_cambios += 1
-
-print(f"Se actualizaron {contador_cambios}")
-
-# Crear el DataFrame de Cobertura Máxima por Departamento (sin importar el tiempo)
-
-# df cobertura máxima por poblado/cabecera municipal
-df_cob_max_cpob_4g = (
-    df_4g.groupby(['DEPARTAMENTO', 'CPOB'])[['PCT_CLARO', 'PCT_MOVISTAR', 'PCT_TIGO', 'PCT_WOM']]
-    .max() # <-- Encuentra el valor máximo de cada operador para ese CPOB a través del tiempo.
-    .reset_index()
-)
-
-# Promedio departamental de los PCT_COB máximos reportados
-df_cob_max_depto_4g = (
-    df_cob_max_cpob_4g.groupby('DEPARTAMENTO')[['PCT_CLARO', 'PCT_MOVISTAR', 'PCT_TIGO', 'PCT_WOM']]
-    .mean()
-    .reset_index()
-)
-
-# Renombrar columnas para reflejar el cálculo de 'Máximo Promedio'
-df_cob_max_depto_4g.rename(columns={
-    'PCT_CLARO': 'PCT_MAX_PROMEDIO_CLARO',
-    'PCT_MOVISTAR': 'PCT_MAX_PROMEDIO_MOVISTAR',
-    'PCT_TIGO': 'PCT_MAX_PROMEDIO_TIGO',
-    'PCT_WOM': 'PCT_MAX_PROMEDIO_WOM'
-}, inplace=True)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+    @etapa(1, depende=('df_4g', 'codigos_departamento'))
+    def df_cob_depto_periodo_4g(self):
+        # Promedio departamental del % cubierto en 4G por operador en cada periodo,
+        # una fila por departamento y periodo, con ID_DEPARTAMENTO para el mapa
+        df_periodo = self.codigos_departamento.merge(promedios_depto_periodo(self.df_4g), on='DEPARTAMENTO')
+        df_periodo = df_periodo[['ID_DEPARTAMENTO'] + list(df_periodo.columns.drop('ID_DEPARTAMENTO'))]
+        return df_periodo.rename(columns={
+            'PCT_CLARO': 'PCT_PROMEDIO_CLARO',
+            'PCT_MOVISTAR': 'PCT_PROMEDIO_MOVISTAR',
+            'PCT_TIGO': 'PCT_PROMEDIO_TIGO',
+            'PCT_WOM': 'PCT_PROMEDIO_WOM'
+        })
 
+    def explorar(self):
+        """Imprime la exploración inicial del conjunto y del GeoJSON."""
+        df = self.df
+        df.info()
 
+        # Dimensiones del df
+        print(df.shape)
 
+        # Revisar si hay valores nulos
+        print(f"Valores nulos: {df.isnull().values.any()}")
 
+        # Revisar los tipos de datos
+        print(df.dtypes)
 
+        # Resumen estadístico
+        print(df.describe())
 
+        print(f"Departamentos: {self.num_departamentos}")
+        print(f"Municipios: {self.num_municipios}")
+        print(f"CPOB: {self.num_cpob}")
 
+        print(self.df_max_tecnologia.dtypes)
 
+        counties = self.counties
+        print(f"GeoJSON cargado exitosamente. Contiene {len(counties['features'])} entidades geográficas.")
 
+        # Comparar los códigos DIVIPOLA del GeoJSON con los del conjunto de cobertura móvil
+        nombres_mapa = {f['id']: f['properties']['NOMBRE_DPT'] for f in counties['features']}
+        codigos = self.codigos_departamento.set_index('ID_DEPARTAMENTO')['DEPARTAMENTO']
+        print(f"Departamentos sin polígono en el mapa: {sorted(codigos[~codigos.index.isin(list(nombres_mapa))])}")
+        print(f"Polígonos sin datos: {sorted(n for c, n in nombres_mapa.items() if c not in codigos.index)}")
 
+    def calentar(self):
+        """Calcula por adelantado todas las tablas."""
+        for nombre in TABLAS:
+            getattr(self, nombre)
+        return self
 
 
+# Tablas que se pueden importar directamente desde el módulo
+TABLAS = [
+    nombre for nombre, valor in vars(PipelineCobertura).items()
+    if isinstance(valor, cached_property) and nombre not in ('huella_entrada', 'huella_historial')
+]
 
+_pipeline = None
 
 
+def obtener_pipeline():
+    """Pipeline compartido por los módulos que importan tablas de aquí.
 
+    Usa el historial de DIR_HISTORIAL si tiene trimestres registrados.
+    """
+    global _pipeline
+    if _pipeline is None:
+        historial = HistorialCobertura()
+        _pipeline = PipelineCobertura(historial=historial if historial.periodos else None)
+    return _pipeline
 
 
+def __getattr__(nombre):
+    # Se llama solo para nombres que no existen en el módulo: las tablas se
+    # piden al pipeline compartido la primera vez que se importan
+    if nombre in TABLAS:
+        return getattr(obtener_pipeline(), nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
+if __name__ == '__main__':
+    obtener_pipeline().explorar()
@@ -0,0 +1,267 @@
+"""
+Geometrías de los departamentos de Colombia para los mapas coropléticos.
+
+El GeoJSON se descarga una sola vez y se guarda en ``DIR_GEOMETRIAS``; las
+cargas siguientes no usan la red. Junto con la versión completa se guardan
+versiones simplificadas a varias tolerancias (``NIVELES``), que pesan mucho
+menos en cada figura y se dibujan más rápido en el navegador.
+
+Cada polígono queda con ``id`` = código DIVIPOLA del departamento (entero,
+p. ej. 5 para Antioquia), el mismo valor de ID_DEPARTAMENTO en el CSV de
+cobertura. Así los mapas se unen con los datos por código, con
+``locations=ID_DEPARTAMENTO``, sin comparar nombres.
+
+La simplificación preserva la topología: los límites compartidos entre dos
+departamentos se simplifican una sola vez (como un arco) y los dos polígonos
+usan exactamente los mismos puntos, así no aparecen huecos ni traslapes
+entre vecinos. Los puntos donde se unen tres o más departamentos no se
+eliminan nunca.
+
+Uso:
+    python -m src.geometria            # descarga (si falta) y genera los niveles
+    python -m src.geometria --forzar   # vuelve a descargar
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+from urllib.request import urlopen
+
+# URL del archivo GeoJSON de Colombia
+URL_GEOJSON = 'https://gist.githubusercontent.com/john-guerra/43c7656821069d00dcbc/raw/be6a6e239cd5b5b803c6e7c2ec405b793a9064dd/Colombia.geo.json'
+
+# Carpeta de las copias locales (configurable por variable de entorno)
+DIR_GEOMETRIAS = os.environ.get('COBERTURA_DIR_GEOMETRIAS', os.path.join('data', 'cache', 'geojson'))
+
+# Tolerancia de simplificación por nivel de detalle, en grados (0.01° ≈ 1.1 km)
+NIVELES = {
+    'completo': 0,      # geometría original
+    'medio': 0.005,     # mapas de todo el país
+    'bajo': 0.02,       # miniaturas y vistas pequeñas
+}
+
+# Decimales que se conservan en las versiones simplificadas (5 ≈ 1 m)
+DECIMALES = 5
+
+# Propiedad con el código DIVIPOLA de cada polígono ('DPTO' en el GeoJSON de
+# departamentos; para un GeoJSON de municipios sería la de su código)
+CAMPO_ID = 'DPTO'
+
+# Cambiar este número cuando cambie cómo se preparan las copias,
+# así las guardadas con la versión anterior se vuelven a generar
+VERSION_GEOMETRIAS = 2
+
+
+def _rutas(url, dir_geometrias, campo_id=CAMPO_ID):
+    """Ruta de la copia de cada nivel para una URL dada."""
+    origen = f'{url}|{campo_id}|{VERSION_GEOMETRIAS}'
+    nombre = 'colombia_' + hashlib.sha1(origen.encode('utf-8')).hexdigest()[:12]
+    return {nivel: os.path.join(dir_geometrias, f'{nombre}_{nivel}.geo.json') for nivel in NIVELES}
+
+
+def _guardar_json(datos, ruta):
+    """Escribe un JSON de forma atómica."""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, ruta)
+
+
+# ---------------- Simplificación con arcos compartidos
+
+
+def _distancia_segmento(p, a, b):
+    """Distancia del punto ``p`` al segmento ``a``-``b``."""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def douglas_peucker(puntos, tolerancia):
+    """Simplifica una línea conservando sus extremos (Douglas-Peucker, sin recursión)."""
+    if len(puntos) < 3:
+        return list(puntos)
+    conservar = [False] * len(puntos)
+    conservar[0] = conservar[-1] = True
+    pendientes = [(0, len(puntos) - 1)]
+    while pendientes:
+        inicio, fin = pendientes.pop()
+        lejano, distancia = None, tolerancia
+        for i in range(inicio + 1, fin):
+            d = _distancia_segmento(puntos[i], puntos[inicio], puntos[fin])
+            if d > distancia:
+                lejano, distancia = i, d
+        if lejano is not None:
+            conservar[lejano] = True
+            pendientes.append((inicio, lejano))
+            pendientes.append((lejano, fin))
+    return [p for p, c in zip(puntos, conservar) if c]
+
+
+def _anillos(geometria):
+    """Anillos (listas de puntos) de un Polygon o MultiPolygon."""
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    return []
+
+
+def simplificar(geojson, tolerancia):
+    """Copia de ``geojson`` con los polígonos simplificados sin romper la topología.
+
+    1. Un punto es un nodo si tiene más de dos vecinos distintos (allí se
+       separan los límites de dos departamentos). Los anillos con menos de
+       tres nodos reciben nodos extra para no colapsar.
+    2. Cada anillo se corta en sus nodos; cada tramo es un arco.
+    3. Cada arco se simplifica una sola vez, en un sentido canónico, y los
+       anillos que lo comparten reutilizan el mismo resultado.
+    """
+    anillos = [
+        [tuple(p[:2]) for p in anillo]
+        for feature in geojson['features']
+        for poligono in _anillos(feature['geometry'])
+        for anillo in poligono
+    ]
+
+    vecinos = {}
+    for anillo in anillos:
+        for i in range(len(anillo) - 1):
+            a, b = anillo[i], anillo[i + 1]
+            vecinos.setdefault(a, set()).add(b)
+            vecinos.setdefault(b, set()).add(a)
+    nodos = {p for p, v in vecinos.items() if len(v) > 2}
+
+    # Cada anillo necesita al menos tres nodos para no colapsar. Los que se
+    # agregan se eligen solo por geometría, así un anillo repetido (p. ej. un
+    # enclave y el hueco que deja) recibe los mismos en los dos polígonos
+    for anillo in anillos:
+        puntos = set(anillo)
+        fijos = [p for p in dict.fromkeys(anillo) if p in nodos]
+        while len(fijos) < 3 and len(fijos) < len(puntos):
+            libres = sorted(puntos.difference(fijos))
+            if not fijos:
+                nuevo = libres[0]
+            elif len(fijos) == 1:
+                nuevo = max(libres, key=lambda p: math.dist(p, fijos[0]))
+            else:
+                nuevo = max(libres, key=lambda p: _distancia_segmento(p, fijos[0], fijos[1]))
+            fijos.append(nuevo)
+            nodos.add(nuevo)
+
+    arcos = {}
+
+    def simplificar_arco(arco):
+        canonico = min(tuple(arco), tuple(arco[::-1]))
+        if canonico not in arcos:
+            arcos[canonico] = douglas_peucker(canonico, tolerancia)
+        resultado = arcos[canonico]
+        return resultado if canonico == tuple(arco) else resultado[::-1]
+
+    def simplificar_anillo(anillo):
+        abierto = anillo[:-1] if anillo[0] == anillo[-1] else anillo
+        # Se rota para empezar en un nodo y se recorre de nodo a nodo
+        inicio = next(i for i, p in enumerate(abierto) if p in nodos)
+        rotado = abierto[inicio:] + abierto[:inicio] + [abierto[inicio]]
+        cortes = [i for i, p in enumerate(rotado) if p in nodos]
+        resultado = [rotado[0]]
+        for a, b in zip(cortes[:-1], cortes[1:]):
+            resultado.extend(simplificar_arco(rotado[a:b + 1])[1:])
+        return [[round(x, DECIMALES), round(y, DECIMALES)] for x, y in resultado]
+
+    simplificado = {k: v for k, v in geojson.items() if k != 'features'}
+    simplificado['features'] = []
+    for feature in geojson['features']:
+        geometria = feature['geometry']
+        poligonos = [
+            [simplificar_anillo([tuple(p[:2]) for p in anillo]) for anillo in poligono]
+            for poligono in _anillos(geometria)
+        ]
+        coordenadas = poligonos[0] if geometria['type'] == 'Polygon' else poligonos
+        simplificado['features'].append({
+            **feature,
+            'geometry': {'type': geometria['type'], 'coordinates': coordenadas},
+        })
+    return simplificado
+
+
+def contar_puntos(geojson):
+    """Número total de vértices de los polígonos."""
+    return sum(
+        len(anillo)
+        for feature in geojson['features']
+        for poligono in _anillos(feature['geometry'])
+        for anillo in poligono
+    )
+
+
+# ---------------- Copias locales
+
+
+def asignar_ids(geojson, campo_id=CAMPO_ID):
+    """Pone en cada polígono ``id`` = int(properties[campo_id]) y lo devuelve."""
+    for feature in geojson['features']:
+        feature['id'] = int(feature['properties'][campo_id])
+    return geojson
+
+
+def preparar_geometrias(url=URL_GEOJSON, dir_geometrias=DIR_GEOMETRIAS, forzar=False, campo_id=CAMPO_ID):
+    """Descarga el GeoJSON si no hay copia local (o si se fuerza) y genera todos los niveles.
+
+    Los ids DIVIPOLA se asignan aquí, una sola vez, y quedan guardados en
+    cada copia. Devuelve las rutas de cada nivel.
+    """
+    rutas = _rutas(url, dir_geometrias, campo_id)
+    if forzar or not os.path.exists(rutas['completo']):
+        with urlopen(url) as response:
+            completo = asignar_ids(json.load(response), campo_id)
+        _guardar_json(completo, rutas['completo'])
+    else:
+        completo = None
+
+    for nivel, tolerancia in NIVELES.items():
+        if nivel != 'completo' and (forzar or not os.path.exists(rutas[nivel])):
+            if completo is None:
+                with open(rutas['completo'], encoding='utf-8') as f:
+                    completo = json.load(f)
+            _guardar_json(simplificar(completo, tolerancia), rutas[nivel])
+    return rutas
+
+
+def cargar_geojson(nivel='medio', url=URL_GEOJSON, dir_geometrias=DIR_GEOMETRIAS, campo_id=CAMPO_ID):
+    """GeoJSON de los departamentos con el nivel de detalle pedido (ver NIVELES).
+
+    Cada polígono trae ``id`` = código DIVIPOLA. Solo usa la red la primera
+    vez; si no hay copia y la descarga falla se lanza un error que lo indica.
+    """
+    if nivel not in NIVELES:
+        raise ValueError(f"Nivel {nivel!r} desconocido; use uno de {list(NIVELES)}")
+    rutas = _rutas(url, dir_geometrias, campo_id)
+    if not os.path.exists(rutas[nivel]):
+        try:
+            preparar_geometrias(url, dir_geometrias, campo_id=campo_id)
+        except OSError as e:
+            raise RuntimeError(
+                f"No hay copia local del GeoJSON en {dir_geometrias} y no se pudo descargar ({e}). "
+                f"Ejecute 'python -m src.geometria' con conexión para prepararla."
+            ) from e
+    with open(rutas[nivel], encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prepara las copias locales del GeoJSON de Colombia.')
+    parser.add_argument('--url', default=URL_GEOJSON)
+    parser.add_argument('--dir', default=DIR_GEOMETRIAS)
+    parser.add_argument('--forzar', action='store_true', help='descarga aunque ya haya copia')
+    args = parser.parse_args()
+
+    for nivel, ruta in preparar_geometrias(args.url, args.dir, args.forzar).items():
+        with open(ruta, encoding='utf-8') as f:
+            puntos = contar_puntos(json.load(f))
+        print(f"{nivel:<9} tolerancia {NIVELES[nivel]:<6} {puntos:>8} puntos {os.path.getsize(ruta) / 1e3:>9.1f} KB  {ruta}")
@@ -0,0 +1,251 @@
+"""
+Historial incremental del conjunto de Cobertura Móvil.
+
+El archivo se publica por trimestre. En lugar de volver a calcular todo desde
+el histórico completo, cada trimestre se registra una vez y sus tablas
+parciales se guardan en Parquet:
+
+    <directorio>/<PERIODO_ID>/base.parquet   agregado base del trimestre
+    <directorio>/<PERIODO_ID>/temp.parquet   áreas por tecnología (df_temp)
+    <directorio>/<PERIODO_ID>/max4g.parquet  % máximo 4G por CPOB del trimestre
+    <directorio>/<PERIODO_ID>/sin.parquet    CPOB sin tecnología del trimestre
+
+Además se mantienen dos acumulados que se actualizan solo con lo nuevo: el
+% máximo 4G por CPOB a través del tiempo (df_cob_max_cpob_4g) y el número de
+CPOB sin tecnología por año y departamento (df_cuenta_sin_tecnologia).
+
+Registrar un trimestre cuesta lo que cuesta leer y agregar ese trimestre; los
+trimestres ya registrados con el mismo contenido no se vuelven a calcular.
+
+Si el historial tiene trimestres registrados, ``code.obtener_pipeline`` lo usa
+como fuente de df_base, df_temp, df_long, df_cob_max_cpob_4g y
+df_cuenta_sin_tecnologia (y de todo lo que sale de ellas, en visualization.py
+y render.py); el CSV se sigue leyendo solo para las tablas del trimestre
+analizado y las que necesitan las filas originales.
+
+Uso:
+    python -m src.historial registrar "data/Datos_Cobertura Movil_1T_2025.csv"
+    python -m src.historial info
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .agregados import (
+    agregado_base, agregar_desde_base, cuenta_sin_cobertura, formato_largo,
+    maximos_cpob, porcentajes_4g, serie_tecnologias
+)
+from .carga import cargar_cobertura
+
+# Carpeta del historial (configurable por variable de entorno)
+DIR_HISTORIAL = os.environ.get('COBERTURA_DIR_HISTORIAL', os.path.join('data', 'cache', 'cobertura'))
+
+# Cambiar este número cuando cambie el contenido de las tablas parciales,
+# así el historial guardado con la versión anterior se descarta
+VERSION_HISTORIAL = 1
+
+PARTES = ('base', 'temp', 'max4g', 'sin')
+
+
+def _guardar_parquet(df, ruta):
+    """Escribe un Parquet de forma atómica."""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    tmp = ruta + '.tmp'
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, ruta)
+
+
+def _unir(partes):
+    """Concatena tablas parciales unificando las categorías (en orden alfabético).
+
+    Así el resultado queda igual que si se hubiera leído todo en un solo
+    archivo, donde cada categórica tiene las categorías ordenadas.
+    """
+    partes = list(partes)
+    categoricas = [col for col, tipo in partes[0].dtypes.items() if tipo == 'category']
+    unido = pd.concat(partes, ignore_index=True)
+    for col in categoricas:
+        categorias = sorted(set().union(*(p[col].cat.categories for p in partes)))
+        unido[col] = unido[col].astype(pd.CategoricalDtype(categorias))
+    return unido
+
+
+def huella_periodo(df_periodo):
+    """Huella del contenido de un trimestre (cambia si cambia cualquier valor)."""
+    valores = pd.util.hash_pandas_object(df_periodo, index=False).to_numpy()
+    return hashlib.sha1(valores.tobytes()).hexdigest()
+
+
+def tablas_periodo(df_periodo):
+    """Tablas parciales de un solo trimestre, a partir de sus filas originales."""
+    base = agregado_base(df_periodo)
+    resumen = agregar_desde_base(base, ['ANNO', 'TRIMESTRE', 'DEPARTAMENTO', 'CPOB', 'TECNOLOGIA'])
+    sin = df_periodo.loc[df_periodo['TECNOLOGIA'] == 'Ninguna', ['ANNO', 'DEPARTAMENTO', 'CPOB']]
+    return {
+        'base': base,
+        'temp': serie_tecnologias(base),
+        'max4g': maximos_cpob(porcentajes_4g(resumen)),
+        'sin': sin.drop_duplicates(ignore_index=True),
+    }
+
+
+class HistorialCobertura:
+    """Tablas de cobertura móvil que se actualizan trimestre a trimestre.
+
+    ``registrar`` agrega los trimestres de un CSV nuevo; las tablas de lectura
+    (``base``, ``df_temp``, ``df_long``, ``df_cob_max_cpob_4g``,
+    ``df_cuenta_sin_tecnologia``) se arman con lo guardado, sin leer CSV.
+    """
+
+    def __init__(self, directorio=DIR_HISTORIAL):
+        self.directorio = directorio
+        self.ruta_indice = os.path.join(directorio, 'indice.json')
+        self.ruta_maximos = os.path.join(directorio, 'maximos_cpob_4g.parquet')
+        self.ruta_sin = os.path.join(directorio, 'sin_cobertura.parquet')
+        self.indice = self._leer_indice()
+
+    def _leer_indice(self):
+        try:
+            with open(self.ruta_indice, encoding='utf-8') as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            indice = None
+        if indice is None or indice.get('version') != VERSION_HISTORIAL:
+            indice = {'version': VERSION_HISTORIAL, 'periodos': {}}
+        return indice
+
+    def _guardar_indice(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        tmp = self.ruta_indice + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.ruta_indice)
+
+    def _ruta_parte(self, periodo, parte):
+        return os.path.join(self.directorio, str(periodo), parte + '.parquet')
+
+    def _leer_partes(self, parte, periodos=None):
+        periodos = self.periodos if periodos is None else periodos
+        return [pd.read_parquet(self._ruta_parte(p, parte)) for p in periodos]
+
+    @property
+    def periodos(self):
+        """PERIODO_ID registrados, en orden."""
+        return sorted(int(p) for p in self.indice['periodos'])
+
+    def registrar(self, ruta, float32=False):
+        """Agrega (o reemplaza) los trimestres del CSV ``ruta``.
+
+        Devuelve la lista de PERIODO_ID que se calcularon. Los trimestres que
+        ya estaban registrados con el mismo contenido se omiten.
+        """
+        df = cargar_cobertura(ruta, float32=float32)
+        periodos = df['PERIODO_ID'].to_numpy()
+
+        nuevos, reemplazados = [], []
+        for periodo in np.unique(periodos):
+            periodo = int(periodo)
+            inicio = np.searchsorted(periodos, periodo, side='left')
+            fin = np.searchsorted(periodos, periodo, side='right')
+            df_periodo = df.iloc[inicio:fin]
+
+            huella = huella_periodo(df_periodo)
+            previo = self.indice['periodos'].get(str(periodo))
+            if previo is not None and previo['huella'] == huella:
+                continue
+
+            for parte, tabla in tablas_periodo(df_periodo).items():
+                _guardar_parquet(tabla, self._ruta_parte(periodo, parte))
+            (reemplazados if previo is not None else nuevos).append(periodo)
+            self.indice['periodos'][str(periodo)] = {
+                'filas': int(fin - inicio),
+                'huella': huella,
+                'fuente': os.path.abspath(ruta),
+                'registrado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }
+
+        if nuevos or reemplazados:
+            self._actualizar_maximos(nuevos, reemplazados)
+            self._actualizar_sin_cobertura(nuevos + reemplazados)
+            self._guardar_indice()
+        return sorted(nuevos + reemplazados)
+
+    def _actualizar_maximos(self, nuevos, reemplazados):
+        if reemplazados or not os.path.exists(self.ruta_maximos):
+            # Un máximo no se puede "deshacer": se rearma con los máximos de
+            # cada trimestre, que son pocas filas por CPOB
+            partes = self._leer_partes('max4g')
+        else:
+            partes = [pd.read_parquet(self.ruta_maximos)] + self._leer_partes('max4g', nuevos)
+        _guardar_parquet(maximos_cpob(_unir(partes)), self.ruta_maximos)
+
+    def _actualizar_sin_cobertura(self, periodos):
+        # La cuenta es por año: se recalculan solo los años de los trimestres nuevos
+        annos = sorted({p // 10 for p in periodos})
+        del_anno = [p for p in self.periodos if p // 10 in annos]
+        cuenta = cuenta_sin_cobertura(_unir(self._leer_partes('sin', del_anno)))
+
+        if os.path.exists(self.ruta_sin):
+            anterior = pd.read_parquet(self.ruta_sin)
+            cuenta = _unir([anterior[~anterior['ANNO'].isin(annos)], cuenta])
+        _guardar_parquet(cuenta, self.ruta_sin)
+
+    @property
+    def huella(self):
+        """Huella del contenido registrado: cambia al agregar o reemplazar un trimestre."""
+        periodos = {p: self.indice['periodos'][str(p)]['huella'] for p in self.periodos}
+        texto = json.dumps({'version': VERSION_HISTORIAL, 'periodos': periodos}, sort_keys=True)
+        return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+    @property
+    def base(self):
+        """Agregado base de todos los trimestres, igual al de ``agregado_base`` sobre el CSV completo."""
+        partes = self._leer_partes('base')
+        # _FILA se cuenta desde el inicio de cada trimestre: se corre según las
+        # filas de los trimestres anteriores
+        desplazamiento = 0
+        for periodo, parte in zip(self.periodos, partes):
+            parte['_FILA'] += desplazamiento
+            desplazamiento += self.indice['periodos'][str(periodo)]['filas']
+        return _unir(partes)
+
+    @property
+    def df_temp(self):
+        return _unir(self._leer_partes('temp'))
+
+    @property
+    def df_long(self):
+        return formato_largo(self.df_temp)
+
+    @property
+    def df_cob_max_cpob_4g(self):
+        return pd.read_parquet(self.ruta_maximos)
+
+    @property
+    def df_cuenta_sin_tecnologia(self):
+        cuenta = pd.read_parquet(self.ruta_sin).sort_values(['ANNO', 'DEPARTAMENTO'], kind='stable')
+        return cuenta.sort_values(['ANNO', 'NUM_CPOB_SIN_TEC'], ascending=[True, False])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Historial incremental de cobertura móvil.')
+    parser.add_argument('accion', choices=['registrar', 'info'])
+    parser.add_argument('rutas', nargs='*', help='CSV de uno o más trimestres (para registrar)')
+    parser.add_argument('--dir', default=DIR_HISTORIAL)
+    args = parser.parse_args()
+
+    historial = HistorialCobertura(args.dir)
+    if args.accion == 'registrar':
+        for ruta in args.rutas:
+            calculados = historial.registrar(ruta)
+            print(f"{ruta}: {len(calculados)} trimestres calculados {calculados}")
+
+    for periodo in historial.periodos:
+        info = historial.indice['periodos'][str(periodo)]
+        print(f"{periodo}  {info['filas']:>9} filas  registrado {info['registrado']}  {info['fuente']}")
@@ -1,55 +1,30 @@
-import pandas as pd
+import os
+import sys
+
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score
 from xgboost import XGBClassifier
 
-# leer base de datos
-df = pd.read_csv('./data/Datos_Cobertura Movil_1T_2023 a 4T_2024.csv', sep=';')
+# Permite ejecutar el script directamente (python src/modelo.py) desde la raíz del proyecto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.agregados import CLAVES_BASE, agregado_base, operador_max, top_k_por_grupo
+from src.carga import COLS_AREA, cargar_cobertura
+
+# leer base de datos (los tipos de cada variable se definen en ESQUEMA_COBERTURA)
+df = cargar_cobertura()
 df.info()
 
-# Convertir el tipo de dato de cada variable
-cols = ['AREA_COB_CLARO', 'AREA_COB_MOVISTAR', 'AREA_COB_TIGO', 'AREA_COB_WOM','AREA_CPOB']
 
-df[cols] = (
-    df[cols]
-    .apply(lambda x: x.str.replace(',', '.', regex=False))  # Reemplaza coma por punto
-    .astype(float)
-)
-
-# Convertir el tipo de dato de cada variable
-df['ANNO'] = df['ANNO'].astype(str)
-df['TRIMESTRE'] = df['TRIMESTRE'].astype(str)
-df['ID_DEPARTAMENTO'] = df['ID_DEPARTAMENTO'].astype(str)
-df['DEPARTAMENTO'] = df['DEPARTAMENTO'].astype(str)
-df['ID_MUNICIPIO'] = df['ID_MUNICIPIO'].astype(str)
-df['MUNICIPIO'] = df['MUNICIPIO'].astype(str)
-df['CPOB'] = df['CPOB'].astype(str)
-df['ID_TECNOLOGIA'] = df['ID_TECNOLOGIA'].astype(str)
-
-
-# Mantener NIVEL_SENNAL en df_actual
-df_modelo = (
-    df.groupby(['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB','TECNOLOGIA'], as_index=False)
-    .agg({
-        'AREA_CPOB': 'first',
-        'AREA_COB_CLARO': 'sum',
-        'AREA_COB_MOVISTAR': 'sum',
-        'AREA_COB_TIGO': 'sum',
-        'AREA_COB_WOM': 'sum',
-        'NIVEL_SENAL': 'mean'   # o 'first'
-    })
-)
+# Mantener NIVEL_SENNAL en df_actual (promedio por grupo, viene en el agregado base)
+df_modelo = agregado_base(df)[CLAVES_BASE + ['AREA_CPOB'] + COLS_AREA + ['NIVEL_SENAL']].copy()
 
 # Calcular el operador ganador
-df_modelo["AREA_COB_MAX"] = df_modelo[["AREA_COB_CLARO", "AREA_COB_MOVISTAR", "AREA_COB_TIGO", "AREA_COB_WOM"]].max(axis=1)
-df_modelo["OPERADOR_MAX"] = df_modelo[["AREA_COB_CLARO","AREA_COB_MOVISTAR","AREA_COB_TIGO","AREA_COB_WOM"]].idxmax(axis=1).str.replace("AREA_COB_", "")
+df_modelo["OPERADOR_MAX"], df_modelo["AREA_COB_MAX"] = operador_max(df_modelo)
+df_modelo = df_modelo[CLAVES_BASE + ['AREA_CPOB'] + COLS_AREA + ['NIVEL_SENAL', 'AREA_COB_MAX', 'OPERADOR_MAX']]
 
 # Quedarse SOLO con la fila de mayor cobertura por CPOB
-df_final = df_modelo.loc[
-    df_modelo.groupby(['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB'])['AREA_COB_MAX']
-    .idxmax()
-]
+df_final = top_k_por_grupo(df_modelo, ['ANNO','TRIMESTRE','DEPARTAMENTO','MUNICIPIO','CPOB'], 'AREA_COB_MAX')
 
 # df_final **ya tiene**:
 # - NIVEL_SENNAL
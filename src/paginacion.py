@@ -0,0 +1,90 @@
+"""
+Visor paginado para mostrar conjuntos de datos grandes en Streamlit.
+
+En lugar de enviar todo el DataFrame al navegador, se calcula en el servidor
+qué filas corresponden a la página pedida (con filtros y orden) y solo esas
+filas se envían con ``st.dataframe``.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class VisorPaginado:
+    """Páginas de ``df`` con filtros por columnas indexadas y orden por cualquier columna.
+
+    Los índices de filtro se construyen una vez al crear el visor. El orden de
+    cada columna se calcula la primera vez que se usa y se reutiliza después.
+    """
+
+    def __init__(self, df, columnas_indice=()):
+        self.df = df
+        # Posiciones de las filas de cada valor, por columna indexada
+        self._indices = {
+            col: df.groupby(col, observed=True).indices
+            for col in columnas_indice
+        }
+        # Orden y rango de cada fila, por (columna, ascendente)
+        self._ordenes = {}
+
+    @property
+    def columnas_indice(self):
+        return list(self._indices)
+
+    def valores(self, columna):
+        """Valores disponibles para filtrar en una columna indexada."""
+        return list(self._indices[columna])
+
+    def _orden(self, columna, ascendente=True):
+        if (columna, ascendente) not in self._ordenes:
+            serie = self.df[columna]
+            if serie.dtype == 'category':
+                codigos = serie.cat.codes.to_numpy().astype(np.int64)
+            else:
+                # Códigos en el orden de los valores; los nulos quedan en -1
+                codigos = pd.factorize(serie, sort=True)[0].astype(np.int64)
+            claves = codigos if ascendente else -codigos
+            # Como sort_values: los nulos al final en los dos sentidos y los
+            # empates en el orden de las filas (lexsort es estable)
+            claves = np.where(codigos < 0, np.iinfo(np.int64).max, claves)
+            orden = np.lexsort((claves,))
+            rango = np.empty(len(orden), dtype=np.int64)
+            rango[orden] = np.arange(len(orden))
+            self._ordenes[columna, ascendente] = (orden, rango)
+        return self._ordenes[columna, ascendente]
+
+    def filas(self, filtros=None, orden=None, ascendente=True):
+        """Posiciones (iloc) de las filas que cumplen ``filtros``, en el orden pedido.
+
+        ``filtros`` es un diccionario {columna indexada: valor}.
+        """
+        posiciones = None
+        for col, valor in (filtros or {}).items():
+            encontradas = self._indices[col].get(valor, np.array([], dtype=np.int64))
+            posiciones = encontradas if posiciones is None else np.intersect1d(posiciones, encontradas)
+
+        if orden is None:
+            if posiciones is None:
+                posiciones = np.arange(len(self.df))
+            return posiciones if ascendente else posiciones[::-1]
+
+        orden_col, rango = self._orden(orden, ascendente)
+        if posiciones is None:
+            # Sin filtros se usa directamente el orden precalculado
+            return orden_col
+        return posiciones[np.argsort(rango[posiciones], kind='stable')]
+
+    def pagina(self, numero, tam_pagina=50, filtros=None, orden=None, ascendente=True):
+        """Devuelve (filas de la página, total de páginas, total de filas).
+
+        ``numero`` empieza en 1 y se ajusta al rango válido.
+        """
+        posiciones = self.filas(filtros, orden, ascendente)
+        total_filas = len(posiciones)
+        total_paginas = max(1, math.ceil(total_filas / tam_pagina))
+
+        numero = min(max(1, numero), total_paginas)
+        inicio = (numero - 1) * tam_pagina
+        return self.df.iloc[posiciones[inicio:inicio + tam_pagina]], total_paginas, total_filas
@@ -0,0 +1,188 @@
+"""
+Genera los gráficos de visualization.py como archivos, sin pantalla y en paralelo.
+
+Cada gráfico se construye en un proceso aparte y se guarda en ``--salida``:
+los de matplotlib/seaborn como PNG y SVG, los de Plotly como HTML (y PNG si
+está instalado ``kaleido``). Al final se escribe ``manifiesto.json`` con la
+huella de entrada, el tiempo y los archivos (con su tamaño) de cada gráfico.
+
+La huella de un gráfico combina las claves de las tablas que usa (ver
+cache_etapas.py) y el código que lo dibuja (visualization.py y resumenes.py).
+Si no cambió desde la última ejecución y sus archivos siguen ahí, el gráfico
+no se vuelve a generar.
+
+Uso:
+    python -m src.render --salida reportes/graficos --procesos 4
+    python -m src.render --forzar                  # genera todo de nuevo
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import matplotlib
+
+matplotlib.use('Agg')  # sin pantalla, también en los procesos hijos
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from . import resumenes, visualization
+from .cache_etapas import clave_etapa
+from .code import obtener_pipeline
+
+DIR_SALIDA = os.path.join('reportes', 'graficos')
+
+# Módulos con el código que dibuja los gráficos; si cambia alguno, se vuelven a generar
+MODULOS_DIBUJO = (visualization, resumenes)
+
+# Resolución de los PNG de matplotlib
+DPI = 120
+
+# Plotly solo exporta imágenes estáticas con kaleido (opcional)
+HAY_KALEIDO = importlib.util.find_spec('kaleido') is not None
+
+
+def _huella_tabla(pipeline, nombre):
+    """Huella de una tabla de code.py sin tener que calcularla si es una etapa en disco."""
+    if pipeline.cache_etapas is not None and hasattr(getattr(type(pipeline), nombre).func, 'etapa'):
+        return clave_etapa(pipeline, nombre)
+    valor = getattr(pipeline, nombre)
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return hashlib.sha1(pd.util.hash_pandas_object(valor).to_numpy().tobytes()).hexdigest()
+    return hashlib.sha1(json.dumps(valor, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def huella_grafico(pipeline, nombre):
+    """Huella de las entradas de un gráfico: sus tablas y el código que lo dibuja."""
+    _, entradas = visualization.GRAFICOS[nombre]
+    partes = []
+    for modulo in MODULOS_DIBUJO:
+        with open(modulo.__file__, 'rb') as f:
+            partes.append(hashlib.sha1(f.read()).hexdigest())
+    partes += [_huella_tabla(pipeline, tabla) for tabla in entradas]
+    return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+
+def renderizar(nombre, salida):
+    """Construye un gráfico y lo guarda en ``salida``. Se ejecuta en un proceso hijo."""
+    inicio = time.perf_counter()
+    funcion, _ = visualization.GRAFICOS[nombre]
+    rutas = []
+    # Los cambios de estilo de seaborn de un gráfico no pasan a los demás
+    with plt.rc_context():
+        fig = funcion()
+        construido = time.perf_counter()
+        if isinstance(fig, plt.Figure):
+            for formato in ('png', 'svg'):
+                rutas.append(os.path.join(salida, f'{nombre}.{formato}'))
+                fig.savefig(rutas[-1], dpi=DPI, bbox_inches='tight')
+            plt.close(fig)
+        else:
+            # plotly.min.js se escribe una sola vez en la carpeta y lo comparten todos los HTML
+            rutas.append(os.path.join(salida, f'{nombre}.html'))
+            fig.write_html(rutas[-1], include_plotlyjs='directory')
+            if HAY_KALEIDO:
+                rutas.append(os.path.join(salida, f'{nombre}.png'))
+                fig.write_image(rutas[-1])
+    return {
+        'segundos_construir': round(construido - inicio, 4),
+        'segundos': round(time.perf_counter() - inicio, 4),
+        'archivos': [{'archivo': os.path.basename(r), 'bytes': os.path.getsize(r)} for r in rutas],
+    }
+
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'graficos': {}}
+
+
+def renderizar_todos(salida=DIR_SALIDA, procesos=None, forzar=False, nombres=None):
+    """Genera los gráficos ``nombres`` (todos por defecto) y devuelve el manifiesto."""
+    inicio = time.perf_counter()
+    os.makedirs(salida, exist_ok=True)
+    ruta_manifiesto = os.path.join(salida, 'manifiesto.json')
+    anterior = _leer_manifiesto(ruta_manifiesto)['graficos']
+    pipeline = obtener_pipeline()
+
+    graficos, pendientes = {}, []
+    for nombre in nombres or visualization.GRAFICOS:
+        huella = huella_grafico(pipeline, nombre)
+        previo = anterior.get(nombre)
+        # Un gráfico que falló (o sin archivos) se vuelve a intentar aunque su huella no cambie
+        vigente = (
+            not forzar and previo is not None and previo.get('huella') == huella
+            and previo.get('estado') != 'error' and previo.get('archivos')
+            and all(os.path.exists(os.path.join(salida, a['archivo'])) for a in previo['archivos'])
+        )
+        if vigente:
+            graficos[nombre] = {**previo, 'estado': 'sin cambios'}
+        else:
+            # El error anterior se conserva hasta que el gráfico se genere bien
+            graficos[nombre] = {'huella': huella}
+            if previo is not None and previo.get('estado') == 'error':
+                graficos[nombre].update(estado='error', error=previo.get('error'), archivos=[])
+            pendientes.append(nombre)
+
+    # Las tablas se calculan una vez aquí (y quedan en la caché de etapas);
+    # los procesos hijos las heredan o las leen del disco
+    for nombre in pendientes:
+        for tabla in visualization.GRAFICOS[nombre][1]:
+            getattr(pipeline, tabla)
+
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {pool.submit(renderizar, nombre, salida): nombre for nombre in pendientes}
+            for futuro in as_completed(futuros):
+                nombre = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    graficos[nombre].update({'estado': 'error', 'error': repr(e), 'archivos': []})
+                else:
+                    graficos[nombre].pop('error', None)
+                    graficos[nombre].update({
+                        'estado': 'generado',
+                        'generado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                        **resultado,
+                    })
+
+    manifiesto = {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'procesos': procesos or os.cpu_count(),
+        'segundos_total': round(time.perf_counter() - inicio, 4),
+        'graficos': graficos,
+    }
+    tmp = ruta_manifiesto + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, ruta_manifiesto)
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera los gráficos de cobertura móvil en archivos.')
+    parser.add_argument('--salida', default=DIR_SALIDA)
+    parser.add_argument('--procesos', type=int, default=None, help='por defecto, uno por núcleo')
+    parser.add_argument('--forzar', action='store_true', help='genera también los gráficos sin cambios')
+    parser.add_argument('--graficos', nargs='+', help='solo estos gráficos (ver visualization.GRAFICOS)')
+    args = parser.parse_args()
+
+    manifiesto = renderizar_todos(args.salida, args.procesos, args.forzar, args.graficos)
+    for nombre, info in manifiesto['graficos'].items():
+        tam = sum(a['bytes'] for a in info.get('archivos', []))
+        segundos = f"{info['segundos']:7.2f}s" if info['estado'] == 'generado' else ' ' * 8
+        print(f"{nombre:<38} {info['estado']:<12} {segundos} {tam / 1e3:9.1f} KB")
+    print(f"Total: {manifiesto['segundos_total']:.2f}s; manifiesto en {os.path.join(args.salida, 'manifiesto.json')}")
+
+
+if __name__ == '__main__':
+    main()
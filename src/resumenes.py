@@ -0,0 +1,251 @@
+"""
+Resúmenes estadísticos para dibujar diagramas de caja y conteos sin las filas originales.
+
+``resumen_cajas`` reduce cada columna a sus cuartiles, bigotes y una muestra
+acotada de valores atípicos; ``conteo_grupos`` reduce un conteo por categoría
+(lo que dibuja ``sns.countplot``) a una fila por grupo. Los gráficos se
+dibujan desde estos resúmenes con ``dibujar_cajas`` y ``dibujar_conteos``,
+así el tiempo y la memoria al graficar dependen del número de grupos y no del
+número de filas. Los resúmenes son DataFrames: se pueden guardar en la caché
+de etapas como cualquier otra tabla.
+
+Los cuartiles pueden ser exactos (como ``sns.boxplot``) o aproximados: en el
+modo 'aproximado' los datos se recorren por bloques y los cuartiles salen de
+una muestra aleatoria de tamaño fijo, con memoria acotada aunque los datos
+vengan de un archivo leído por partes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Atípicos que se guardan por columna (siempre se incluyen el menor y el mayor)
+MAX_ATIPICOS = 500
+
+# Tamaño de la muestra con la que se estiman los cuartiles en el modo 'aproximado'
+TAMANO_MUESTRA = 100_000
+
+# Filas por bloque al recorrer un DataFrame en el modo 'aproximado'
+TAMANO_BLOQUE = 1_000_000
+
+# Color de las líneas de las cajas (el gris que usa seaborn con relleno)
+COLOR_LINEAS = '0.24'
+
+
+class _Reservorio:
+    """Muestra aleatoria uniforme, sin reemplazo, de a lo sumo ``k`` valores vistos por partes.
+
+    Cada valor recibe una clave aleatoria y se conservan los ``k`` de menor clave.
+    """
+
+    def __init__(self, k, rng):
+        self.k = k
+        self.rng = rng
+        self.claves = np.empty(0)
+        self.valores = np.empty(0)
+
+    def agregar(self, valores):
+        self.claves = np.concatenate([self.claves, self.rng.random(len(valores))])
+        self.valores = np.concatenate([self.valores, valores])
+        if len(self.valores) > self.k:
+            conservar = np.argpartition(self.claves, self.k - 1)[:self.k]
+            self.claves, self.valores = self.claves[conservar], self.valores[conservar]
+
+
+def _bloques(datos, columnas, tamano_bloque=TAMANO_BLOQUE):
+    """Bloques de ``datos`` (DataFrame o función que devuelve un iterable de DataFrames)."""
+    if callable(datos):
+        for bloque in datos():
+            yield bloque[columnas]
+    else:
+        for inicio in range(0, len(datos), tamano_bloque):
+            yield datos[columnas].iloc[inicio:inicio + tamano_bloque]
+
+
+def _valores(serie):
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+    return valores[~np.isnan(valores)]
+
+
+def _cuartiles(valores):
+    return np.percentile(valores, [25, 50, 75]) if len(valores) else np.full(3, np.nan)
+
+
+def resumen_cajas(datos, columnas, metodo='exacto', whis=1.5, max_atipicos=MAX_ATIPICOS,
+                  tamano_muestra=TAMANO_MUESTRA, semilla=0):
+    """Una fila por columna con lo necesario para dibujar su diagrama de caja.
+
+    ``datos`` es un DataFrame o una función sin argumentos que devuelve un
+    iterable de DataFrames (p. ej. ``lambda: pd.read_csv(ruta, chunksize=...)``),
+    que en el modo 'aproximado' se recorre dos veces.
+
+    Los bigotes siguen la regla de ``sns.boxplot``: el valor más extremo dentro
+    de ``whis`` rangos intercuartílicos desde la caja. Los atípicos son los
+    valores fuera de los bigotes; se cuentan todos (N_ATIPICOS) y se guarda
+    una muestra aleatoria de a lo sumo ``max_atipicos`` más el menor y el mayor.
+
+    - 'exacto': cuartiles con ``np.percentile``, igual que seaborn.
+    - 'aproximado': cuartiles de una muestra aleatoria de ``tamano_muestra``
+      valores; los bigotes y los atípicos se calculan exactos para esos
+      cuartiles en una segunda pasada. La memoria no depende del número de filas.
+    """
+    if metodo not in ('exacto', 'aproximado'):
+        raise ValueError(f"Método {metodo!r} desconocido; use 'exacto' o 'aproximado'")
+    columnas = list(columnas)
+    rng = np.random.default_rng(semilla)
+
+    if metodo == 'exacto':
+        tabla = pd.concat(list(_bloques(datos, columnas)), ignore_index=True) if callable(datos) else datos
+        exactos = {col: _valores(tabla[col]) for col in columnas}
+        estado = {
+            col: {'n': len(valores), 'suma': valores.sum(), 'cuartiles': _cuartiles(valores)}
+            for col, valores in exactos.items()
+        }
+
+        def recorrer(col):
+            yield exactos[col]
+    else:
+        # Primera pasada: tamaño, suma y una muestra de cada columna
+        estado = {col: {'n': 0, 'suma': 0.0} for col in columnas}
+        muestras = {col: _Reservorio(tamano_muestra, rng) for col in columnas}
+        for bloque in _bloques(datos, columnas):
+            for col in columnas:
+                valores = _valores(bloque[col])
+                estado[col]['n'] += len(valores)
+                estado[col]['suma'] += valores.sum()
+                muestras[col].agregar(valores)
+        for col in columnas:
+            estado[col]['cuartiles'] = _cuartiles(muestras[col].valores)
+
+        def recorrer(col):
+            for bloque in _bloques(datos, [col]):
+                yield _valores(bloque[col])
+
+    filas = []
+    for col in columnas:
+        n, (q1, mediana, q3) = estado[col]['n'], estado[col]['cuartiles']
+        iqr = q3 - q1
+        limite_inf, limite_sup = q1 - whis * iqr, q3 + whis * iqr
+
+        # Bigotes: extremos dentro de los límites
+        bigote_inf, bigote_sup = np.inf, -np.inf
+        for valores in recorrer(col):
+            dentro = valores[(valores >= limite_inf) & (valores <= limite_sup)]
+            if len(dentro):
+                bigote_inf = min(bigote_inf, dentro.min())
+                bigote_sup = max(bigote_sup, dentro.max())
+        # Como matplotlib: si no hay valores dentro, el bigote queda en la caja
+        bigote_inf = q1 if not bigote_inf <= q1 else bigote_inf
+        bigote_sup = q3 if not bigote_sup >= q3 else bigote_sup
+
+        # Atípicos: se cuentan todos y se guarda una muestra con los extremos
+        n_atipicos, minimo, maximo = 0, np.inf, -np.inf
+        muestra = _Reservorio(max_atipicos, rng)
+        for valores in recorrer(col):
+            atipicos = valores[(valores < bigote_inf) | (valores > bigote_sup)]
+            if len(atipicos):
+                n_atipicos += len(atipicos)
+                minimo, maximo = min(minimo, atipicos.min()), max(maximo, atipicos.max())
+                muestra.agregar(atipicos)
+        atipicos = muestra.valores
+        if n_atipicos:
+            atipicos = np.unique(np.concatenate([atipicos, [minimo, maximo]]))
+
+        filas.append({
+            'COLUMNA': col,
+            'N': n,
+            'MEDIA': estado[col]['suma'] / n if n else np.nan,
+            'Q1': q1,
+            'MEDIANA': mediana,
+            'Q3': q3,
+            'BIGOTE_INF': bigote_inf,
+            'BIGOTE_SUP': bigote_sup,
+            'N_ATIPICOS': n_atipicos,
+            'ATIPICOS': np.sort(atipicos),
+        })
+    return pd.DataFrame(filas)
+
+
+def estadisticas_bxp(resumen):
+    """Convierte un resultado de ``resumen_cajas`` en la lista que recibe ``ax.bxp``."""
+    return [
+        {
+            'label': fila.COLUMNA,
+            'mean': fila.MEDIA,
+            'med': fila.MEDIANA,
+            'q1': fila.Q1,
+            'q3': fila.Q3,
+            'whislo': fila.BIGOTE_INF,
+            'whishi': fila.BIGOTE_SUP,
+            'fliers': np.asarray(fila.ATIPICOS, dtype='float64'),
+        }
+        for fila in resumen.itertuples(index=False)
+    ]
+
+
+def conteo_grupos(df, x, hue=None):
+    """Número de filas por ``x`` (y ``hue``), con columna CONTEO.
+
+    ``x`` y ``hue`` salen como categorías en el orden en que aparecen en ``df``,
+    el mismo que ``df[x].unique()``; ``dibujar_conteos`` lo usa como orden
+    de las barras y de la leyenda.
+    """
+    claves = [x] if hue is None else [x, hue]
+    conteos = df.groupby(claves, observed=True, sort=False).size().reset_index(name='CONTEO')
+    for col in claves:
+        orden = df[col].unique()
+        conteos[col] = pd.Categorical(conteos[col], categories=[v for v in orden if pd.notna(v)])
+    return conteos.sort_values(claves, ignore_index=True)
+
+
+# ---------------- Dibujo desde los resúmenes
+
+
+def dibujar_cajas(ax, resumen, palette=None, saturation=0.75, **kwargs):
+    """Dibuja en ``ax`` un diagrama de caja por fila de ``resumen`` (ver ``resumen_cajas``).
+
+    Se ve como ``sns.boxplot(data=df[columnas])``: una caja de cada color de
+    ``palette``, en las posiciones 0, 1, ... con el nombre de cada columna.
+    """
+    import seaborn as sns   # solo hace falta al dibujar
+
+    estadisticas = estadisticas_bxp(resumen)
+    posiciones = np.arange(len(estadisticas))
+    colores = sns.color_palette(palette, len(estadisticas), desat=saturation)
+    lineas = {'color': COLOR_LINEAS, 'solid_capstyle': 'butt'}
+    artistas = ax.bxp(
+        estadisticas,
+        positions=posiciones,
+        widths=0.8,
+        capwidths=0.4,
+        patch_artist=True,
+        manage_ticks=False,
+        boxprops={'edgecolor': COLOR_LINEAS},
+        medianprops=lineas,
+        whiskerprops=lineas,
+        capprops={'color': COLOR_LINEAS},
+        flierprops={'marker': 'o', 'markerfacecolor': 'none', 'markeredgecolor': COLOR_LINEAS},
+        **kwargs,
+    )
+    for caja, color in zip(artistas['boxes'], colores):
+        caja.set_facecolor(color)
+    ax.set_xticks(posiciones, [e['label'] for e in estadisticas])
+    ax.set_xlim(-0.5, len(estadisticas) - 0.5)
+    return ax
+
+
+def dibujar_conteos(ax, conteos, x, hue=None, palette=None, **kwargs):
+    """Dibuja en ``ax`` las barras de ``conteos`` (ver ``conteo_grupos``), como ``sns.countplot``."""
+    import seaborn as sns   # solo hace falta al dibujar
+
+    return sns.barplot(
+        data=conteos,
+        x=x,
+        y='CONTEO',
+        hue=hue,
+        order=list(conteos[x].cat.categories),
+        hue_order=list(conteos[hue].cat.categories) if hue is not None else None,
+        palette=palette,
+        errorbar=None,
+        ax=ax,
+        **kwargs,
+    )
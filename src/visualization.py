@@ -1,21 +1,18 @@
 # Gráficos de Análisis de Cobertura Móvil
+#
+# Cada gráfico se construye con una función que devuelve la figura (de
+# matplotlib o de Plotly) sin mostrarla. ``mostrar_todos()`` los muestra uno
+# tras otro (main.py) y ``src/render.py`` los guarda en archivos en paralelo.
 
 # Importar librerías
-import matplotlib.pyplot as plt, \
-       matplotlib.patches as mpatches
-import seaborn as sns
+# matplotlib, seaborn y plotly se importan dentro de cada gráfico: importar este
+# módulo es rápido y cada gráfico carga solo la librería con la que se dibuja
 import numpy as np
-import plotly.express as px
-from scipy.cluster.hierarchy import linkage, dendrogram
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots   
-
-from .code import (
-    df, df_max_tecnologia, df_comparativo, 
-    porcentaje_operador, conteo_operador, cols, 
-    df_top, df_cuenta_sin_tecnologia, corr_matrix,
-    df_long, df_cob_max_depto_4g, counties 
-)
+
+# Las tablas se piden al pipeline de code.py dentro de cada gráfico, así
+# importar este módulo no calcula nada y cada gráfico usa solo lo que necesita
+from . import code as cobertura
+from .resumenes import dibujar_cajas, dibujar_conteos
 
 # Colores por operador (definición centralizada)
 color_dict = {
@@ -37,313 +34,369 @@ colores = {
 
 #------- GRAFICO 1 -------#
 
-plt.figure(figsize=(14, 6))
-sns.countplot(
-    data=df_top,
-    x='DEPARTAMENTO',
-    hue='TECNOLOGIA',
-    palette=colores
-)
-plt.title('Distribución de Tecnologías en Top Departamentos (2024 - Trimestre 4)', fontsize=14, fontweight='bold')
-plt.xlabel('Departamento', fontsize=12)
-plt.ylabel('Cantidad de Registros', fontsize=12)
-plt.xticks(rotation=45, ha='right')
-plt.legend(title='Tecnología', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.grid(axis='y', alpha=0.3)
-plt.tight_layout()
-plt.show()
+def grafico_1():
+    # Distribución de tecnologías en los top departamentos del periodo
+    import matplotlib.pyplot as plt
+
+    # Se dibuja desde los conteos por departamento y tecnología, no desde las filas
+    fig, ax = plt.subplots(figsize=(14, 6))
+    dibujar_conteos(ax, cobertura.conteo_top, 'DEPARTAMENTO', 'TECNOLOGIA', palette=colores)
+    plt.title('Distribución de Tecnologías en Top Departamentos (2024 - Trimestre 4)', fontsize=14, fontweight='bold')
+    plt.xlabel('Departamento', fontsize=12)
+    plt.ylabel('Cantidad de Registros', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    plt.legend(title='Tecnología', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    return fig
 
 #------- GRAFICO 2 -------#
 
-plt.figure(figsize=(8, 5))
-sns.boxplot(data=df[cols])
+def grafico_2():
+    # Distribución del área de cobertura por operador
+    import matplotlib.pyplot as plt
 
-plt.title('Distribución del Área de Cobertura por Operador')
-plt.xlabel('Operador')
-plt.ylabel('Área de Cobertura')
-plt.grid(True, linestyle='--', alpha=0.6)
-plt.show()
+    # Se dibuja desde los cuartiles, bigotes y una muestra de atípicos de cada
+    # operador (ver resumenes.py), no desde todas las filas
+    fig, ax = plt.subplots(figsize=(8, 5))
+    dibujar_cajas(ax, cobertura.resumen_areas)
 
+    plt.title('Distribución del Área de Cobertura por Operador')
+    plt.xlabel('Operador')
+    plt.ylabel('Área de Cobertura')
+    plt.grid(True, linestyle='--', alpha=0.6)
+    return fig
 
-#------- GRAFICO 3 -------#
 
-# Configuración estética de los gráficos
-sns.set_style("whitegrid")
+#------- GRAFICO 3 -------#
 
-# Contar y calcular porcentajes
-conteo_tecnologia = df_max_tecnologia.groupby('TECNOLOGIA_MAX')['CPOB'].nunique()
-total_cpob = conteo_tecnologia.sum()
-porcentajes = (conteo_tecnologia / total_cpob * 100).round(1)
+def grafico_3():
+    # Número de CPOB por tecnología predominante
+    import matplotlib.patches as mpatches
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_max_tecnologia = cobertura.df_max_tecnologia
+
+    # Configuración estética de los gráficos
+    sns.set_style("whitegrid")
+
+    # Contar y calcular porcentajes
+    conteo_tecnologia = df_max_tecnologia.groupby('TECNOLOGIA_MAX', observed=True)['CPOB'].nunique()
+    # Como texto: con el índice categórico seaborn dibujaría también las tecnologías
+    # sin CPOB y las etiquetas quedarían sobre barras equivocadas
+    conteo_tecnologia.index = conteo_tecnologia.index.astype(str)
+    total_cpob = conteo_tecnologia.sum()
+    porcentajes = (conteo_tecnologia / total_cpob * 100).round(1)
+
+    # Crear el gráfico
+    fig = plt.figure(figsize=(10, 9))
+    ax = sns.barplot(x=conteo_tecnologia.index, y=conteo_tecnologia.values,
+                     order=list(conteo_tecnologia.index), palette=colores)
+
+    plt.title('Número de CPOB por Tecnología Predominante', fontsize=16, fontweight='bold')
+    plt.xlabel('Tecnología Predominante', fontsize=12)
+    plt.ylabel('Número de CPOB', fontsize=12)
+    plt.xticks(rotation=0)
+
+    # Agregar valores y porcentajes arriba de cada barra
+    for i, (valor, porcentaje) in enumerate(zip(conteo_tecnologia.values, porcentajes.values)):
+        ax.text(i, valor + 0.5, f'{valor}\n({porcentaje}%)', 
+                ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # Crear y agregar la leyenda
+    leyenda = [
+        mpatches.Patch(color='red', label='2G = Tecnología mediocre'),
+        mpatches.Patch(color='orange', label='3G = Tecnología aceptable'),
+        mpatches.Patch(color='green', label='4G = Tecnología buena'),
+        mpatches.Patch(color='blue', label='5G = Tecnología excelente')
+    ]
+    ax.legend(handles=leyenda, title='Leyenda')
+
+    plt.tight_layout()
+    return fig
 
-# Crear el gráfico
-plt.figure(figsize=(10, 9))
-ax = sns.barplot(x=conteo_tecnologia.index, y=conteo_tecnologia.values, palette=colores)
 
-plt.title('Número de CPOB por Tecnología Predominante', fontsize=16, fontweight='bold')
-plt.xlabel('Tecnología Predominante', fontsize=12)
-plt.ylabel('Número de CPOB', fontsize=12)
-plt.xticks(rotation=0)
+#------- GRAFICO 4 -------#
 
-# Agregar valores y porcentajes arriba de cada barra
-for i, (valor, porcentaje) in enumerate(zip(conteo_tecnologia.values, porcentajes.values)):
-    ax.text(i, valor + 0.5, f'{valor}\n({porcentaje}%)', 
-            ha='center', va='bottom', fontsize=11, fontweight='bold')
+def grafico_4():
+    # Departamentos con mayor y menor cobertura móvil promedio
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-# Crear y agregar la leyenda
-leyenda = [
-    mpatches.Patch(color='red', label='2G = Tecnología mediocre'),
-    mpatches.Patch(color='orange', label='3G = Tecnología aceptable'),
-    mpatches.Patch(color='green', label='4G = Tecnología buena'),
-    mpatches.Patch(color='blue', label='5G = Tecnología excelente')
-]
-ax.legend(handles=leyenda, title='Leyenda')
+    df_comparativo = cobertura.df_comparativo
 
-plt.tight_layout()
-plt.show()
+    # Colores por operador
+    operadores = df_comparativo['OPERADOR_MAX'].unique()
 
+    # Configuración del gráfico
+    fig = plt.figure(figsize=(15, 8))
+    sns.set_style("whitegrid")
 
-#------- GRAFICO 4 -------#
-
-# Colores por operador
-operadores = df_comparativo['OPERADOR_MAX'].unique()
-palette = sns.color_palette("Set2", len(operadores))
-# `color_dict` moved to top (below imports) to centralize color settings
-
-# Configuración del gráfico
-plt.figure(figsize=(15, 8))
-sns.set_style("whitegrid")
-
-# Crear gráfico de barras horizontales
-ax = sns.barplot(
-    x='PORCENTAJE_COBERTURA',
-    y='DEPARTAMENTO',
-    data=df_comparativo,
-    palette=[color_dict[op] for op in df_comparativo['OPERADOR_MAX']]
-)
-
-# Etiquetas de valor
-for i, v in enumerate(df_comparativo['PORCENTAJE_COBERTURA']):
-    ax.text(
-        v + (0.5 if v > 0 else 0),  # posición derecha o izquierda
-        i,
-        f"{abs(v):.1f}%",
-        color='black',
-        va='center',
-        ha='left' if v > 0 else 'right',
-        fontsize=10,
-        fontweight='bold'
+    # Crear gráfico de barras horizontales
+    ax = sns.barplot(
+        x='PORCENTAJE_COBERTURA',
+        y='DEPARTAMENTO',
+        data=df_comparativo,
+        order=df_comparativo['DEPARTAMENTO'].unique(),
+        palette=[color_dict[op] for op in df_comparativo['OPERADOR_MAX']]
     )
 
-# Línea central en 0
-plt.axvline(0, color='black', linewidth=1)
-
-# Títulos y etiquetas
-plt.title('Departamentos con mayor y menor cobertura móvil promedio (2024)', fontsize=16, fontweight='bold')
-plt.xlabel('Porcentaje de cobertura promedio (%)', fontsize=13)
-plt.ylabel('Departamento', fontsize=13)
-
-# Leyenda de operadores
-handles = [plt.Rectangle((0,0),1,1, color=color_dict[op]) for op in operadores]
-plt.legend(handles, operadores, title='Operador predominante', loc='upper right')
-
-plt.tight_layout()
-plt.show()
+    # Etiquetas de valor
+    for i, v in enumerate(df_comparativo['PORCENTAJE_COBERTURA']):
+        ax.text(
+            v + (0.5 if v > 0 else 0),  # posición derecha o izquierda
+            i,
+            f"{abs(v):.1f}%",
+            color='black',
+            va='center',
+            ha='left' if v > 0 else 'right',
+            fontsize=10,
+            fontweight='bold'
+        )
+
+    # Línea central en 0
+    plt.axvline(0, color='black', linewidth=1)
+
+    # Títulos y etiquetas
+    plt.title('Departamentos con mayor y menor cobertura móvil promedio (2024)', fontsize=16, fontweight='bold')
+    plt.xlabel('Porcentaje de cobertura promedio (%)', fontsize=13)
+    plt.ylabel('Departamento', fontsize=13)
+
+    # Leyenda de operadores
+    handles = [plt.Rectangle((0,0),1,1, color=color_dict[op]) for op in operadores]
+    plt.legend(handles, operadores, title='Operador predominante', loc='upper right')
+
+    plt.tight_layout()
+    return fig
 
 #------- GRAFICO 5 -------#
 
-# Graficar pastel
-fig, ax = plt.subplots(figsize=(8,8))
-wedges, texts = ax.pie(
-    porcentaje_operador,
-    labels=None,  # no mostramos etiquetas directamente
-    colors=[color_dict[op] for op in conteo_operador.index],
-    startangle=90,
-    counterclock=False,
-    wedgeprops={'edgecolor':'white', 'linewidth':1.5}
-)
-
-# Añadir etiquetas fuera con porcentaje y conteo
-for i, w in enumerate(wedges):
-    ang = (w.theta2 + w.theta1)/2.  # ángulo medio de la porción
-    x = 1.19 * np.cos(np.deg2rad(ang))  # coordenada x
-    y = 1.13 * np.sin(np.deg2rad(ang))  # coordenada y
-    ax.text(
-        x, y,
-        f"{conteo_operador.index[i]}\n{porcentaje_operador.values[i]:.1f}%\n({conteo_operador.values[i]})",
-        ha='center', va='center', fontsize=11, fontweight='bold'
+def grafico_5():
+    # Porcentaje de predominancia por operador
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    conteo_operador = cobertura.conteo_operador
+    porcentaje_operador = cobertura.porcentaje_operador
+    sns.set_style("whitegrid")   # mismo estilo que los gráficos anteriores
+
+    # Graficar pastel
+    fig, ax = plt.subplots(figsize=(8,8))
+    wedges, texts = ax.pie(
+        porcentaje_operador,
+        labels=None,  # no mostramos etiquetas directamente
+        colors=[color_dict[op] for op in conteo_operador.index],
+        startangle=90,
+        counterclock=False,
+        wedgeprops={'edgecolor':'white', 'linewidth':1.5}
     )
 
-plt.title('Porcentaje de predominancia por operador (CPOB)', fontsize=16, fontweight='bold')
-plt.show()
+    # Añadir etiquetas fuera con porcentaje y conteo
+    for i, w in enumerate(wedges):
+        ang = (w.theta2 + w.theta1)/2.  # ángulo medio de la porción
+        x = 1.19 * np.cos(np.deg2rad(ang))  # coordenada x
+        y = 1.13 * np.sin(np.deg2rad(ang))  # coordenada y
+        ax.text(
+            x, y,
+            f"{conteo_operador.index[i]}\n{porcentaje_operador.values[i]:.1f}%\n({conteo_operador.values[i]})",
+            ha='center', va='center', fontsize=11, fontweight='bold'
+        )
+
+    plt.title('Porcentaje de predominancia por operador (CPOB)', fontsize=16, fontweight='bold')
+    return fig
 
 #------- GRAFICO 6 -------#
-plt.figure(figsize=(10,6))
-sns.barplot(
-    data=df_cuenta_sin_tecnologia,
-    x='DEPARTAMENTO',
-    y='NUM_CPOB_SIN_TEC',
-    hue='ANNO',
-    palette='YlOrBr'
-)
-plt.title('Departamentos con más cabeceras municipales sin cobertura móvil')
-plt.xlabel('Departamento')
-plt.ylabel('Número de poblados sin tecnología')
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.show()
+
+def grafico_6():
+    # Departamentos con más cabeceras municipales sin cobertura móvil
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_cuenta_sin_tecnologia = cobertura.df_cuenta_sin_tecnologia
+    sns.set_style("whitegrid")   # mismo estilo que los gráficos anteriores
+
+    fig = plt.figure(figsize=(10,6))
+    sns.barplot(
+        data=df_cuenta_sin_tecnologia.astype({'ANNO': str}),   # el año como categoría en la leyenda
+        x='DEPARTAMENTO',
+        y='NUM_CPOB_SIN_TEC',
+        hue='ANNO',
+        order=df_cuenta_sin_tecnologia['DEPARTAMENTO'].unique(),
+        palette='YlOrBr'
+    )
+    plt.title('Departamentos con más cabeceras municipales sin cobertura móvil')
+    plt.xlabel('Departamento')
+    plt.ylabel('Número de poblados sin tecnología')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    return fig
 
 #------- GRAFICO 7 -------#
 
-# Crear el heatmap
-fig = px.imshow(
-    corr_matrix,
-    text_auto=True,            # muestra los valores dentro del heatmap
-    color_continuous_scale='RdBu_r',  # paleta típica para correlaciones
-    aspect="auto",
-    title="Mapa de Correlación entre Variables de Área de Cobertura"
-)
-fig.show()
+def grafico_7():
+    # Crear el heatmap
+    import plotly.express as px
+
+    return px.imshow(
+        cobertura.corr_matrix,
+        text_auto=True,            # muestra los valores dentro del heatmap
+        color_continuous_scale='RdBu_r',  # paleta típica para correlaciones
+        aspect="auto",
+        title="Mapa de Correlación entre Variables de Área de Cobertura"
+    )
 
 #------- GRAFICO 8 -------#
 
-# Gráfico temporal
-fig = px.line(
-    df_long,
-    x="PERIODO",
-    y="AREA_COBERTURA",
-    color="OPERADOR",
-    facet_row="TECNOLOGIA",        # un panel por tecnología (2G, 3G, 4G, 5G)
-    markers=True,
-    title="Evolución Temporal del Área de Cobertura por Operador y Tecnología"
-)
+def grafico_8():
+    # Gráfico temporal
+    import plotly.express as px
+
+    fig = px.line(
+        cobertura.df_long,
+        x="PERIODO",
+        y="AREA_COBERTURA",
+        color="OPERADOR",
+        facet_row="TECNOLOGIA",        # un panel por tecnología (2G, 3G, 4G, 5G)
+        markers=True,
+        title="Evolución Temporal del Área de Cobertura por Operador y Tecnología"
+    )
 
-fig.update_layout(height=1200)
-fig.show()
+    fig.update_layout(height=1200)
+    return fig
 
 #------- GRAFICO 9 -------#
 
-# Gráfico temporal
-fig = px.line(
-    df_long,
-    x="PERIODO",
-    y="AREA_COBERTURA",
-    color="OPERADOR",
-    facet_row="TECNOLOGIA",        # un panel por tecnología (2G, 3G, 4G, 5G)
-    markers=True,
-    title="Evolución Temporal del Área de Cobertura por Operador y Tecnología"
-)
+def grafico_9():
+    # Gráfico temporal
+    import plotly.express as px
+
+    fig = px.line(
+        cobertura.df_long,
+        x="PERIODO",
+        y="AREA_COBERTURA",
+        color="OPERADOR",
+        facet_row="TECNOLOGIA",        # un panel por tecnología (2G, 3G, 4G, 5G)
+        markers=True,
+        title="Evolución Temporal del Área de Cobertura por Operador y Tecnología"
+    )
 
-fig.update_layout(height=1200)
-fig.show()
+    fig.update_layout(height=1200)
+    return fig
 
 
 #------- GRAFICO 10 -------#
 
-# CLARO - Cobertura 4G Máxima Observada - Promedio Departamental
-
-locs = df_cob_max_depto_4g['DEPARTAMENTO']
-
-for loc in counties['features']:
-    loc['id'] = loc['properties']['NOMBRE_DPT']
-
-
+# Cobertura 4G Máxima Observada - Promedio Departamental, por operador
+# (un solo mapa: el GeoJSON va una vez en la figura y el menú solo cambia los valores)
+
+def mapa_operadores(datos, geojson, columnas, titulo, dimension=None,
+                    locations='ID_DEPARTAMENTO', texto='DEPARTAMENTO'):
+    """Mapa coroplético con un menú para elegir el operador.
+
+    ``columnas`` es {operador: columna de ``datos``}. Cada opción del menú
+    cambia solo los valores (z) de la única traza, así la geometría se envía
+    una vez. Con ``dimension`` (p. ej. 'PERIODO') hay una opción por cada
+    operador y valor de esa columna. ``datos`` debe tener una fila por
+    ubicación (y valor de ``dimension``), como df_cob_max_depto_4g o
+    df_cob_depto_periodo_4g.
+    """
+    import plotly.graph_objects as go
+
+    if dimension is None:
+        grupos = [(None, datos)]
+    else:
+        grupos = list(datos.groupby(dimension, observed=True, sort=True))
+
+    opciones = []
+    for operador, columna in columnas.items():
+        for valor, grupo in grupos:
+            etiqueta = operador if valor is None else f'{operador} · {valor}'
+            opciones.append((etiqueta, grupo[locations], grupo[texto], grupo[columna]))
+
+    _, locs, nombres, z = opciones[0]
+    fig = go.Figure(go.Choroplethmapbox(
+                        geojson=geojson,
+                        locations=locs,
+                        z=z,
+                        text=nombres,
+                        hovertemplate='%{text}<br>%{z:.1f}%<extra></extra>',
+                        colorscale='Viridis',
+                        colorbar_title='Cobertura promedio (%)'))
+
+    botones = [
+        dict(label=etiqueta,
+             method='update',
+             args=[{'z': [z], 'locations': [locs], 'text': [nombres]},
+                   {'title.text': f"{titulo}<br>de {etiqueta}"}])
+        for etiqueta, locs, nombres, z in opciones
+    ]
+    fig.update_layout(mapbox_style="carto-positron",
+                            mapbox_zoom=4.2,
+                            width=750,    # Ancho total de la figura en píxeles
+                            height=700,    # Alto total de la figura en píxeles
+                            title={
+                                'text': f"{titulo}<br>de {opciones[0][0]}",
+                                'x': 0.5,  # Centrar el título
+                                'xanchor': 'center',
+                                'yanchor': 'top'
+                            },
+                            updatemenus=[dict(buttons=botones, direction='down', x=0.01, y=0.99,
+                                              xanchor='left', yanchor='top')],
+                            mapbox_center = {"lat": 4.570868, "lon": -74.2973328})
+    return fig
+
+
+def grafico_10():
+    # Cobertura 4G máxima observada por departamento, con menú de operador
+    return mapa_operadores(
+        cobertura.df_cob_max_depto_4g,
+        cobertura.counties,
+        {operador: f'PCT_MAX_PROMEDIO_{operador}' for operador in ['CLARO', 'MOVISTAR', 'TIGO', 'WOM']},
+        "Promedio Departamental de Cobertura 4G Máxima Observada",
+    )
 
-fig = go.Figure(go.Choroplethmapbox(
-                    geojson=counties,
-                    locations=locs,
-                    z=df_cob_max_depto_4g['PCT_MAX_PROMEDIO_CLARO'],
-                    colorscale='Viridis',
-                    colorbar_title='Cobertura promedio (%)'))
-fig.update_layout(mapbox_style="carto-positron",
-                        mapbox_zoom=4.2,
-                        width=750,    # Ancho total de la figura en píxeles
-                        height=700,    # Alto total de la figura en píxeles
-                        title={
-                            'text': "Promedio Departamental de Cobertura 4G Máxima Observada<br>de CLARO",
-                            'x': 0.5,  # Centrar el título
-                            'xanchor': 'center',
-                            'yanchor': 'top'
-                        },
-                        mapbox_center = {"lat": 4.570868, "lon": -74.2973328})
-fig.show()
 
 #------- GRAFICO 11 -------#
-# MOVISTAR - Cobertura 4G Máxima Observada - Promedio Departamental
-
-fig = go.Figure(go.Choroplethmapbox(
-                    geojson=counties,
-                    locations=locs,
-                    z=df_cob_max_depto_4g['PCT_MAX_PROMEDIO_MOVISTAR'],
-                    colorscale='Viridis',
-                    colorbar_title='Cobertura promedio (%)'))
-fig.update_layout(mapbox_style="carto-positron",
-                        mapbox_zoom=4.2,
-                        width=750,    # Ancho total de la figura en píxeles
-                        height=700,    # Alto total de la figura en píxeles
-                        title={
-                            'text': "Promedio Departamental de Cobertura 4G Máxima Observada<br>de MOVISTAR",
-                            'x': 0.5,  # Centrar el título
-                            'xanchor': 'center',
-                            'yanchor': 'top'
-                        },
-                        mapbox_center = {"lat": 4.570868, "lon": -74.2973328})
-fig.show()
-
-#------- GRAFICO 12 -------#
-
-# TIGO - Cobertura 4G Máxima Observada - Promedio Departamental
-fig = go.Figure(go.Choroplethmapbox(
-                    geojson=counties,
-                    locations=locs,
-                    z=df_cob_max_depto_4g['PCT_MAX_PROMEDIO_TIGO'],
-                    colorscale='Viridis',
-                    colorbar_title='Cobertura promedio (%)'))
-fig.update_layout(mapbox_style="carto-positron",
-                        mapbox_zoom=4.2,
-                        width=750,    # Ancho total de la figura en píxeles
-                        height=700,    # Alto total de la figura en píxeles
-                        title={
-                            'text': "Promedio Departamental de Cobertura 4G Máxima Observada<br>de TIGO",
-                            'x': 0.5,  # Centrar el título
-                            'xanchor': 'center',
-                            'yanchor': 'top'
-                        },
-                        mapbox_center = {"lat": 4.570868, "lon": -74.2973328})
-fig.show()
-
-#------- GRAFICO 13 -------#
-
-# WOM - Cobertura 4G Máxima Observada - Promedio Departamental
-fig = go.Figure(go.Choroplethmapbox(
-                    geojson=counties,
-                    locations=locs,
-                    z=df_cob_max_depto_4g['PCT_MAX_PROMEDIO_WOM'],
-                    colorscale='Viridis',
-                    colorbar_title='Cobertura promedio (%)'))
-fig.update_layout(mapbox_style="carto-positron",
-                        mapbox_zoom=4.2,
-                        width=750,    # Ancho total de la figura en píxeles
-                        height=700,    # Alto total de la figura en píxeles
-                        title={
-                            'text': "Promedio Departamental de Cobertura 4G Máxima Observada<br>de WOM",
-                            'x': 0.5,  # Centrar el título
-                            'xanchor': 'center',
-                            'yanchor': 'top'
-                        },
-                        mapbox_center = {"lat": 4.570868, "lon": -74.2973328})
-fig.show()
-
-#------- GRAFICO 14 -------#
-
-
-
-
-
-
-
 
+def grafico_11():
+    # Cobertura 4G promedio por departamento en cada periodo, con menú de operador y periodo
+    return mapa_operadores(
+        cobertura.df_cob_depto_periodo_4g,
+        cobertura.counties,
+        {operador: f'PCT_PROMEDIO_{operador}' for operador in ['CLARO', 'MOVISTAR', 'TIGO', 'WOM']},
+        "Promedio Departamental de Cobertura 4G por Periodo",
+        dimension='PERIODO',
+    )
 
 
+#---------------------------------------------
+
+# Gráficos en orden: nombre -> (función, tablas de code.py que usa)
+GRAFICOS = {
+    'grafico_01_tecnologias_top_deptos': (grafico_1, ('conteo_top',)),
+    'grafico_02_boxplot_areas': (grafico_2, ('resumen_areas',)),
+    'grafico_03_tecnologia_predominante': (grafico_3, ('df_max_tecnologia',)),
+    'grafico_04_comparativo_deptos': (grafico_4, ('df_comparativo',)),
+    'grafico_05_predominancia_operador': (grafico_5, ('conteo_operador', 'porcentaje_operador')),
+    'grafico_06_sin_cobertura': (grafico_6, ('df_cuenta_sin_tecnologia',)),
+    'grafico_07_correlacion': (grafico_7, ('corr_matrix',)),
+    'grafico_08_evolucion_temporal': (grafico_8, ('df_long',)),
+    'grafico_09_evolucion_temporal': (grafico_9, ('df_long',)),
+    'grafico_10_mapa_4g_operadores': (grafico_10, ('df_cob_max_depto_4g', 'counties')),
+    'grafico_11_mapa_4g_periodos': (grafico_11, ('df_cob_depto_periodo_4g', 'counties')),
+}
 
 
+def mostrar_todos():
+    """Muestra todos los gráficos, uno tras otro."""
+    import matplotlib.pyplot as plt
 
+    for funcion, _ in GRAFICOS.values():
+        # Los cambios de estilo de seaborn de un gráfico no pasan a los demás
+        with plt.rc_context():
+            fig = funcion()
+            if isinstance(fig, plt.Figure):
+                plt.show()
+            else:
+                fig.show()
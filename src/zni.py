@@ -0,0 +1,416 @@
+"""
+Carga de los datos de 'Estado de la prestación del servicio de energía en
+Zonas No Interconectadas' (ZNI) usados por el dashboard de app.py.
+
+La primera carga descarga el CSV de la fuente y guarda una copia local en
+Parquet junto con sus metadatos. Las siguientes cargas leen esa copia y solo
+vuelven a la fuente cuando vence el TTL o cuando se fuerza la actualización.
+Si la fuente no está disponible se sigue trabajando con la última copia.
+
+``PipelineZNI`` reúne todas las tablas del dashboard. Importar este módulo no
+lee datos ni usa la red: cada tabla se calcula la primera vez que se pide.
+``PipelineZNI.renovar`` pasa a una copia nueva de los datos; si la copia solo
+agrega filas, los indicadores anuales se actualizan con esas filas en lugar
+de recalcularse.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from .paginacion import VisorPaginado
+
+# URL del archivo original en GitHub
+RUTA_ZNI = 'https://github.com/juliandariogiraldoocampo/analisis_taltech/raw/refs/heads/main/explorador/Estado_de_la_prestaci%C3%B3n_del_servicio_de_energ%C3%ADa_en_Zonas_No_Interconectadas_20251021.csv'
+
+# Carpeta de la copia local y tiempo de vida en segundos (configurables por variable de entorno)
+DIR_CACHE = os.environ.get('ZNI_DIR_CACHE', os.path.join('data', 'cache'))
+TTL_CACHE = int(os.environ.get('ZNI_TTL_CACHE', 24 * 60 * 60))
+
+# Cambiar este número cuando cambie la forma en que se leen las columnas,
+# así las copias guardadas con el esquema anterior se descartan
+VERSION_ESQUEMA = 2
+
+# Tipos de lectura de las columnas numéricas. Las cifras vienen con ',' como
+# separador de miles ("1,234,567.00"), que se interpreta al leer el CSV
+ESQUEMA_ZNI = {
+    'AÑO SERVICIO': 'int16',
+    'ENERGÍA ACTIVA': 'float64',
+    'ENERGÍA REACTIVA': 'float64',
+    'POTENCIA MÁXIMA': 'float64',
+}
+
+# Columnas que se guardan como entero (se trunca la parte decimal)
+COLS_ENTERAS = ['ENERGÍA ACTIVA', 'ENERGÍA REACTIVA']
+
+# Departamentos insulares que no se incluyen en los gráficos (Colombia continental)
+DEPTOS_EXCLUIDOS = [
+    'ARCHIPIELAGO DE SAN ANDRES',
+    'ARCHIPIELAGO DE SAN ANDRES y PROVIDENCIA',
+    'ARCHIPIELAGO DE SAN ANDRES, PROVIDENCIA Y SANTA CATALINA'
+]
+
+# Vocales tildadas que se reemplazan en los nombres de lugares
+TABLA_TILDES = str.maketrans('ÁÉÍÓÚ', 'AEIOU')
+
+
+def _rutas_copia(origen, dir_cache):
+    """Rutas del Parquet y de sus metadatos para una fuente dada."""
+    nombre = 'zni_' + hashlib.sha1(origen.encode('utf-8')).hexdigest()[:12]
+    base = os.path.join(dir_cache, nombre)
+    return base + '.parquet', base + '.json'
+
+
+def _leer_metadatos(ruta_meta):
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def leer_zni(origen):
+    """Lee el CSV original (URL o archivo local) con los tipos de ESQUEMA_ZNI.
+
+    Las energías se convierten al entero más pequeño que las contiene, sin
+    pasar por columnas de texto intermedias.
+    """
+    df = pd.read_csv(origen, thousands=',', dtype=ESQUEMA_ZNI)
+    for col in COLS_ENTERAS:
+        df[col] = pd.to_numeric(df[col].astype('int64'), downcast='integer')
+    return df
+
+
+def huella_memoria(df):
+    """Bytes que ocupa cada columna (incluye el contenido de los textos)."""
+    return df.memory_usage(index=False, deep=True)
+
+
+def comparar_memoria(origen=RUTA_ZNI):
+    """Compara la memoria de las columnas numéricas leídas como texto y con el esquema."""
+    cols = list(ESQUEMA_ZNI)
+    antes = huella_memoria(pd.read_csv(origen, usecols=cols, dtype=str))
+    despues = huella_memoria(leer_zni(origen)[cols])
+
+    reporte = pd.DataFrame({'BYTES_ANTES': antes, 'BYTES_DESPUES': despues})
+    reporte.loc['TOTAL'] = reporte.sum()
+    reporte['REDUCCION_%'] = ((1 - reporte['BYTES_DESPUES'] / reporte['BYTES_ANTES']) * 100).round(1)
+    return reporte
+
+
+def normalizar_nombres(serie):
+    """Quita las tildes de una columna de nombres y la devuelve como categórica.
+
+    El reemplazo se hace solo sobre las etiquetas únicas; después se remapean
+    los códigos, de modo que nombres que quedan iguales (p. ej. 'BOLÍVAR' y
+    'BOLIVAR') comparten categoría. Las categorías quedan ordenadas
+    alfabéticamente, igual que el orden de un groupby sobre texto.
+    """
+    cat = pd.Categorical(serie)
+    etiquetas = cat.categories.str.translate(TABLA_TILDES)
+    nuevas = etiquetas.unique().sort_values()
+
+    # Posición de cada etiqueta original en las nuevas categorías (-1 = nulo)
+    mapa = np.append(nuevas.get_indexer(etiquetas), -1)
+    codigos = mapa[cat.codes]
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=nuevas),
+        index=serie.index,
+        name=serie.name,
+    )
+
+
+def construir_cubo(df):
+    """Agrega el conjunto por DEPARTAMENTO, MUNICIPIO y AÑO SERVICIO.
+
+    Guarda la suma de energía activa y reactiva y la potencia máxima. Todos
+    los gráficos e indicadores del dashboard se obtienen sumando o filtrando
+    este cubo, que es mucho más pequeño que el conjunto original.
+    """
+    return (
+        df.groupby(['DEPARTAMENTO', 'MUNICIPIO', 'AÑO SERVICIO'], observed=True, as_index=False)
+        .agg({
+            'ENERGÍA ACTIVA': 'sum',
+            'ENERGÍA REACTIVA': 'sum',
+            'POTENCIA MÁXIMA': 'max'
+        })
+    )
+
+
+def construir_indice(df, claves):
+    """Diccionario {valor de ``claves``: filas de ``df``} para consultas sin filtrar.
+
+    Se recorre ``df`` una sola vez; después cada consulta es un acceso al
+    diccionario. Con varias claves (p. ej. ['DEPARTAMENTO', 'MUNICIPIO']) las
+    llaves son tuplas.
+    """
+    return {
+        valor: grupo
+        for valor, grupo in df.groupby(claves, observed=True, sort=False)
+    }
+
+
+def _agregar_deltas(kpis, por):
+    """Ordena la tabla de indicadores y calcula la variación frente al año anterior."""
+    claves = ([por] if por else []) + ['AÑO SERVICIO']
+    kpis = kpis.sort_values(claves, ignore_index=True)
+
+    if por:
+        anterior = kpis.groupby(por, observed=True)['TOTAL'].shift(1)
+    else:
+        anterior = kpis['TOTAL'].shift(1)
+    kpis['DELTA_%'] = (kpis['TOTAL'] - anterior) / anterior * 100
+    return kpis
+
+
+def calcular_kpis(cubo, por=None, valor='ENERGÍA ACTIVA'):
+    """Total de ``valor`` por año y su variación porcentual frente al año anterior.
+
+    Sirve para cualquier cantidad de años. Con ``por`` (p. ej. 'DEPARTAMENTO')
+    los indicadores se calculan por grupo. El primer año de cada grupo queda
+    con DELTA_% nulo.
+    """
+    claves = ([por] if por else []) + ['AÑO SERVICIO']
+    kpis = (
+        cubo.groupby(claves, observed=True, as_index=False)[valor]
+        .sum()
+        .rename(columns={valor: 'TOTAL'})
+    )
+    return _agregar_deltas(kpis, por)
+
+
+def actualizar_kpis(kpis, filas_nuevas, por=None, valor='ENERGÍA ACTIVA'):
+    """Suma a ``kpis`` las filas nuevas (cubo o datos de detalle) sin recalcular el histórico.
+
+    Solo se agregan las filas nuevas; luego se combinan con la tabla de
+    indicadores, que tiene una fila por año (y grupo).
+    """
+    claves = ([por] if por else []) + ['AÑO SERVICIO']
+    nuevos = calcular_kpis(filas_nuevas, por, valor)
+    kpis = (
+        pd.concat([kpis[claves + ['TOTAL']], nuevos[claves + ['TOTAL']]], ignore_index=True)
+        .groupby(claves, observed=True, as_index=False)['TOTAL']
+        .sum()
+    )
+    return _agregar_deltas(kpis, por)
+
+
+def filas_agregadas(anterior, nuevo):
+    """Filas que ``nuevo`` agrega al final de ``anterior``.
+
+    Devuelve None si ``nuevo`` no empieza con las mismas filas de ``anterior``
+    (se quitó o cambió alguna), y entonces no basta con sumar lo nuevo.
+    """
+    n = len(anterior)
+    if len(nuevo) < n or list(nuevo.columns) != list(anterior.columns):
+        return None
+    huella_anterior = pd.util.hash_pandas_object(anterior, index=False).to_numpy()
+    huella_nuevo = pd.util.hash_pandas_object(nuevo.iloc[:n], index=False).to_numpy()
+    if not np.array_equal(huella_anterior, huella_nuevo):
+        return None
+    return nuevo.iloc[n:]
+
+
+def _guardar_copia(df, origen, ruta_parquet, ruta_meta):
+    """Escribe el Parquet y sus metadatos de forma atómica."""
+    os.makedirs(os.path.dirname(ruta_parquet) or '.', exist_ok=True)
+
+    tmp_parquet = ruta_parquet + '.tmp'
+    df.to_parquet(tmp_parquet, index=False)
+    os.replace(tmp_parquet, ruta_parquet)
+
+    meta = {
+        'origen': origen,
+        'descargado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'marca_tiempo': time.time(),
+        'version_esquema': VERSION_ESQUEMA,
+        'filas': int(df.shape[0]),
+        'columnas': [str(c) for c in df.columns],
+    }
+    tmp_meta = ruta_meta + '.tmp'
+    with open(tmp_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_meta, ruta_meta)
+    return meta
+
+
+def cargar_zni(origen=RUTA_ZNI, dir_cache=DIR_CACHE, ttl=TTL_CACHE, forzar=False):
+    """Devuelve el conjunto de datos ZNI usando la copia local cuando es posible.
+
+    La copia se renueva si tiene más de ``ttl`` segundos, si fue guardada con
+    otra versión del esquema o si ``forzar`` es True. Los metadatos de la copia
+    usada quedan en ``df.attrs['fuente']``.
+    """
+    ruta_parquet, ruta_meta = _rutas_copia(origen, dir_cache)
+    meta = _leer_metadatos(ruta_meta)
+
+    hay_copia = (
+        meta is not None
+        and meta.get('version_esquema') == VERSION_ESQUEMA
+        and os.path.exists(ruta_parquet)
+    )
+    vigente = hay_copia and (time.time() - meta['marca_tiempo']) < ttl
+
+    if not vigente or forzar:
+        try:
+            df = leer_zni(origen)
+        except Exception as e:
+            if not hay_copia:
+                raise
+            # Sin conexión: se trabaja con la última copia disponible
+            warnings.warn(
+                f"No se pudo actualizar los datos ZNI ({e}); se usa la copia del {meta['descargado']}."
+            )
+        else:
+            meta = _guardar_copia(df, origen, ruta_parquet, ruta_meta)
+            df.attrs['fuente'] = meta
+            return df
+
+    df = pd.read_parquet(ruta_parquet)
+    df.attrs['fuente'] = meta
+    return df
+
+
+class PipelineZNI:
+    """Tablas del dashboard ZNI, calculadas bajo demanda y memorizadas.
+
+    Cada atributo se calcula la primera vez que se consulta, junto con los que
+    necesita, y luego se reutiliza. No depende de Streamlit, así que puede
+    compartirse entre sesiones, precalentarse o perfilarse por separado.
+    Un pipeline no cambia de datos: ``renovar`` devuelve otro con la copia nueva.
+    """
+
+    def __init__(self, origen=RUTA_ZNI, dir_cache=DIR_CACHE, ttl=TTL_CACHE):
+        self.origen = origen
+        self.dir_cache = dir_cache
+        self.ttl = ttl
+
+    def _cargar(self, forzar=False):
+        df = cargar_zni(self.origen, self.dir_cache, self.ttl, forzar)
+        df['DEPARTAMENTO'] = normalizar_nombres(df['DEPARTAMENTO'])
+        df['MUNICIPIO'] = normalizar_nombres(df['MUNICIPIO'])
+        return df
+
+    @cached_property
+    def df(self):
+        """Conjunto completo con nombres sin tildes."""
+        return self._cargar()
+
+    @cached_property
+    def version(self):
+        """Identifica la copia de datos en uso (fecha de descarga)."""
+        return self.df.attrs['fuente']['descargado']
+
+    @cached_property
+    def resumen(self):
+        """Tamaño del conjunto: variables, observaciones, departamentos y municipios."""
+        return {
+            'variables': self.df.shape[1],
+            'filas': self.df.shape[0],
+            'num_deptos': self.df['DEPARTAMENTO'].nunique(),
+            'num_mpios': self.df['MUNICIPIO'].nunique(),
+        }
+
+    @cached_property
+    def df_colombia_continental(self):
+        return self.df[~self.df['DEPARTAMENTO'].isin(DEPTOS_EXCLUIDOS)]
+
+    @cached_property
+    def cubo(self):
+        return construir_cubo(self.df_colombia_continental)
+
+    @cached_property
+    def df_agrupado(self):
+        return self.cubo.groupby(['DEPARTAMENTO', 'MUNICIPIO'], observed=True)[['ENERGÍA ACTIVA', 'ENERGÍA REACTIVA']].sum().reset_index()
+
+    @cached_property
+    def df_pivote(self):
+        return self.cubo.pivot_table(
+            index='DEPARTAMENTO',
+            columns='AÑO SERVICIO',
+            values=['ENERGÍA ACTIVA'],
+            aggfunc='sum',
+            observed=True
+        )
+
+    @cached_property
+    def kpis(self):
+        return calcular_kpis(self.cubo)
+
+    @cached_property
+    def df_depto_anios(self):
+        return self.cubo.groupby(['DEPARTAMENTO', 'AÑO SERVICIO'], observed=True)['ENERGÍA ACTIVA'].sum().reset_index()
+
+    @cached_property
+    def departamentos(self):
+        return self.df_depto_anios['DEPARTAMENTO'].unique().tolist()
+
+    @cached_property
+    def indice_deptos(self):
+        return construir_indice(self.df_depto_anios, 'DEPARTAMENTO')
+
+    @cached_property
+    def visor(self):
+        return VisorPaginado(self.df, columnas_indice=['DEPARTAMENTO', 'MUNICIPIO'])
+
+    def renovar(self, forzar=False):
+        """Pipeline con la copia de datos vigente (renovada si venció el TTL o si se fuerza).
+
+        Si la copia no cambió devuelve este mismo pipeline. Si no, devuelve uno
+        nuevo; cuando la copia nueva solo agrega filas al final de la anterior,
+        ese pipeline parte de los indicadores ya calculados y les suma las filas
+        nuevas (``actualizar_kpis``). Las demás tablas se calculan al pedirlas.
+        """
+        if 'df' not in self.__dict__:
+            return self   # todavía no se ha leído ninguna copia
+        meta = _leer_metadatos(_rutas_copia(self.origen, self.dir_cache)[1])
+        vigente = meta is not None and (time.time() - meta['marca_tiempo']) < self.ttl
+        if not forzar and vigente and meta == self.df.attrs['fuente']:
+            return self
+
+        df = self._cargar(forzar)
+        if df.attrs['fuente'] == self.df.attrs['fuente']:
+            return self   # la fuente no respondió y se sigue con la misma copia
+
+        nuevo = PipelineZNI(self.origen, self.dir_cache, self.ttl)
+        nuevo.df = df
+        if 'kpis' in self.__dict__:
+            nuevas = filas_agregadas(self.df, df)
+            if nuevas is not None:
+                nuevas = nuevas[~nuevas['DEPARTAMENTO'].isin(DEPTOS_EXCLUIDOS)]
+                nuevo.kpis = actualizar_kpis(self.kpis, nuevas)
+        return nuevo
+
+    def calentar(self):
+        """Calcula por adelantado todas las tablas (p. ej. al iniciar el servidor)."""
+        for nombre in ('resumen', 'df_agrupado', 'df_pivote', 'kpis',
+                       'departamentos', 'indice_deptos', 'visor', 'version'):
+            getattr(self, nombre)
+        return self
+
+
+if __name__ == '__main__':
+    # Permite precargar o renovar la copia local, p. ej. desde una tarea programada:
+    #   python -m src.zni --forzar
+    parser = argparse.ArgumentParser(description='Actualiza la copia local de los datos ZNI.')
+    parser.add_argument('--origen', default=RUTA_ZNI)
+    parser.add_argument('--dir-cache', default=DIR_CACHE)
+    parser.add_argument('--ttl', type=int, default=TTL_CACHE)
+    parser.add_argument('--forzar', action='store_true', help='descarga aunque la copia esté vigente')
+    parser.add_argument('--memoria', action='store_true', help='muestra la memoria por columna antes y después del esquema')
+    args = parser.parse_args()
+
+    if args.memoria:
+        print(comparar_memoria(args.origen))
+
+    df = cargar_zni(args.origen, args.dir_cache, args.ttl, args.forzar)
+    fuente = df.attrs['fuente']
+    print(f"{fuente['filas']} filas, descargadas el {fuente['descargado']} desde {fuente['origen']}")